@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Soul Foods data pipeline.
+Synthetic inputs are built by repeating the bundled data/ files so they keep
+the same shape (columns, products, price strings) at a larger scale.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import process_data
+
+
+def make_synthetic_data(out_dir, scale, source_pattern=process_data.DATA_GLOB):
+    """Write copies of the bundled raw files with every data row repeated ``scale`` times."""
+    os.makedirs(out_dir, exist_ok=True)
+    out_files = []
+
+    for path in process_data.discover_data_files(source_pattern):
+        with open(path, 'r', encoding='utf-8') as f:
+            header = f.readline()
+            body = f.read()
+        if not body.endswith('\n'):
+            body += '\n'
+
+        out_path = os.path.join(out_dir, os.path.basename(path))
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.write(header)
+            for _ in range(scale):
+                f.write(body)
+        out_files.append(out_path)
+
+    return out_files
+
+
+def count_rows(files):
+    """Count raw data rows (excluding headers) across ``files``."""
+    rows = 0
+    for path in files:
+        with open(path, 'rb') as f:
+            rows += sum(1 for _ in f) - 1
+    return rows
+
+
+def bench_workers(scales, worker_counts, shard_mb=None):
+    """Time ``process_parallel`` for each scale and worker count."""
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='soul_foods_bench_')
+    shard_bytes = int(shard_mb * 1024 * 1024) if shard_mb else None
+
+    try:
+        for scale in scales:
+            data_files = make_synthetic_data(os.path.join(work_dir, f'x{scale}'), scale)
+            input_rows = count_rows(data_files)
+            output_file = os.path.join(work_dir, f'formatted_x{scale}.csv')
+
+            for workers in worker_counts:
+                start = time.perf_counter()
+                process_data.process_parallel(data_files, output_file, workers=workers, shard_bytes=shard_bytes)
+                elapsed = time.perf_counter() - start
+
+                results.append({
+                    'scale': scale,
+                    'workers': workers,
+                    'input_rows': input_rows,
+                    'seconds': elapsed,
+                    'rows_per_sec': input_rows / elapsed,
+                })
+                print(f"  x{scale:<4} workers={workers:<3} {input_rows:>10} rows "
+                      f"{elapsed:8.2f}s {input_rows / elapsed:>12,.0f} rows/s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def make_formatted_data(out_dir, scale):
+    """Build synthetic raw inputs at ``scale`` and run the ETL over them.
+
+    Returns the path of the formatted CSV written into ``out_dir``.
+    """
+    data_files = make_synthetic_data(os.path.join(out_dir, 'raw'), scale)
+    output_file = os.path.join(out_dir, 'formatted_data.csv')
+    process_data.process_streaming(data_files, output_file)
+    return output_file
+
+
+def best_of(func, repeat):
+    """Return the fastest of ``repeat`` timed calls to ``func``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_coldstart(scales, repeat=5):
+    """Time the dashboard data load from the CSV, the columnar copy and the binary cache.
+
+    The cache figure is a full ``load_cached_data`` (rows, daily cube and rollups)
+    from an existing formatted_data.cache; the first call writes it.
+    """
+    import dash_app
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='soul_foods_bench_')
+
+    try:
+        for scale in scales:
+            scale_dir = os.path.join(work_dir, f'x{scale}')
+            csv_file = make_formatted_data(scale_dir, scale)
+            parquet_file = os.path.join(scale_dir, 'formatted_data.parquet')
+            process_data.write_parquet(csv_file, parquet_file)
+
+            csv_seconds = best_of(lambda: dash_app.load_data(csv_file, parquet_path=None), repeat)
+            parquet_seconds = best_of(lambda: dash_app.load_data(csv_file, parquet_file), repeat)
+
+            build_start = time.perf_counter()
+            dash_app.load_cached_data(csv_file, parquet_path=None)
+            cache_build_seconds = time.perf_counter() - build_start
+            cache_seconds = best_of(lambda: dash_app.load_cached_data(csv_file, parquet_path=None), repeat)
+
+            results.append({
+                'scale': scale,
+                'csv_seconds': csv_seconds,
+                'parquet_seconds': parquet_seconds,
+                'cache_build_seconds': cache_build_seconds,
+                'cache_seconds': cache_seconds,
+            })
+            print(f"  x{scale:<4} csv {csv_seconds * 1000:9.1f} ms   parquet {parquet_seconds * 1000:9.1f} ms"
+                  f"   speedup {csv_seconds / parquet_seconds:5.1f}x   cache {cache_seconds * 1000:7.2f} ms"
+                  f" (built in {cache_build_seconds * 1000:.0f} ms)   speedup {csv_seconds / cache_seconds:6.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def format_sales_untyped(path):
+    """The original untyped ingestion: object columns, string price parsing."""
+    df = pd.read_csv(path)
+    pink_morsels = df[df['product'] == 'pink morsel'].copy()
+    pink_morsels['price'] = pink_morsels['price'].str.replace('$', '', regex=False).astype(float)
+    pink_morsels['sales'] = pink_morsels['price'] * pink_morsels['quantity']
+    return pink_morsels[['sales', 'date', 'region']]
+
+
+def format_sales_typed(path):
+    """The typed ingestion used by process_data.py."""
+    return process_data.format_sales(process_data.read_raw(path))
+
+
+def measure(func, *args):
+    """Return ``(seconds, peak_bytes)`` for one call, with peak memory from tracemalloc."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_dtypes(scales):
+    """Compare rows/sec and peak memory of untyped vs. typed ingestion of one input file."""
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='soul_foods_bench_')
+
+    try:
+        for scale in scales:
+            path = make_synthetic_data(os.path.join(work_dir, f'x{scale}'), scale)[0]
+            input_rows = count_rows([path])
+
+            for name, func in [('untyped', format_sales_untyped), ('typed', format_sales_typed)]:
+                elapsed, peak = measure(func, path)
+                results.append({
+                    'scale': scale,
+                    'path': name,
+                    'input_rows': input_rows,
+                    'rows_per_sec': input_rows / elapsed,
+                    'peak_bytes': peak,
+                })
+                print(f"  x{scale:<4} {name:<8} {input_rows:>10} rows {input_rows / elapsed:>12,.0f} rows/s "
+                      f"peak {peak / 1024 / 1024:8.1f} MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def parse_importtime(stderr):
+    """Parse ``python -X importtime`` output into ``{module: (self_us, cumulative_us)}``."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(module='dash_app', statement=None):
+    """Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Returns ``(modules, seconds)``: the parsed per-module import times and the wall
+    time of ``statement`` (by default just the import).
+    """
+    statement = statement or f'import {module}'
+    code = (
+        'import time; start = time.perf_counter()\n'
+        f'{statement}\n'
+        'print(time.perf_counter() - start)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return parse_importtime(result.stderr), float(result.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(top=10):
+    """Report import time of dash_app and the cost of each deferred startup step."""
+    modules, seconds = measure_import()
+    print(f"  import dash_app            {seconds * 1000:9.1f} ms")
+    for name, (_, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]:
+        print(f"    {name:<30} {cumulative / 1000:9.1f} ms")
+
+    steps = [
+        ('+ build app', 'import dash_app; dash_app.get_app()'),
+        ('+ build app and warm up', 'import dash_app; dash_app.get_app(); dash_app.warm_up()'),
+    ]
+    results = {'import_seconds': seconds}
+    for label, statement in steps:
+        _, seconds = measure_import(statement=statement)
+        results[label] = seconds
+        print(f"  {label:<26} {seconds * 1000:9.1f} ms")
+    return results
+
+
+def bench_figure(repeat=20):
+    """Per-request latency of the plotly express figure path vs. the template fast path.
+
+    Both paths include the JSON serialization Dash applies to every response.
+    """
+    import dash_app
+    import plotly.io as pio
+
+    cube = dash_app.get_snapshot().daily_sales
+    results = []
+    for region in ['all', 'north', 'south', 'east', 'west']:
+        data = dash_app.chart_data(region, dash_app.region_daily_sales(cube, region))
+        dash_app.figure_template(region, webgl=len(data) > dash_app.WEBGL_THRESHOLD)
+
+        px_seconds = best_of(lambda: pio.json.to_json_plotly(dash_app.build_figure(data, region)), repeat)
+        fast_seconds = best_of(lambda: pio.json.to_json_plotly(dash_app.build_chart(region, data)), repeat)
+        results.append({'region': region, 'px_seconds': px_seconds, 'template_seconds': fast_seconds})
+        print(f"  {region:<6} px.line {px_seconds * 1000:8.2f} ms   template {fast_seconds * 1000:8.2f} ms"
+              f"   speedup {px_seconds / fast_seconds:5.1f}x")
+    return results
+
+
+def bench_store(scales, repeat=200):
+    """Memory and per-query latency of the daily cube vs. the array-backed series store.
+
+    The cube answers a region/date-range query the way dash_app did before the
+    store: a ``slice_dates`` row slice and ``region_daily_sales``. The store answers
+    it with two binary searches and a column slice. The long-format frame's size is
+    shown for reference; no chart query has read it since the cube was added.
+    """
+    import dash_app
+    from series_store import SeriesStore
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='soul_foods_bench_')
+    start_date, end_date = '2020-06-01', '2021-06-01'
+
+    try:
+        for scale in scales:
+            df = dash_app.load_data(make_formatted_data(os.path.join(work_dir, f'x{scale}'), scale), None)
+            cube = dash_app.build_daily_cube(df)
+            store = SeriesStore.from_cube(cube)
+
+            def cube_query(region):
+                return dash_app.region_daily_sales(dash_app.slice_dates(cube, start_date, end_date), region)
+
+            frame_bytes = int(df.memory_usage(deep=True).sum())
+            cube_bytes = int(cube.memory_usage(deep=True).sum())
+            for region in ['all', 'north']:
+                cube_seconds = best_of(lambda: cube_query(region), repeat)
+                store_seconds = best_of(lambda: store.series(region, start_date, end_date), repeat)
+                results.append({
+                    'scale': scale,
+                    'region': region,
+                    'rows': len(df),
+                    'frame_bytes': frame_bytes,
+                    'cube_bytes': cube_bytes,
+                    'store_bytes': store.nbytes,
+                    'cube_seconds': cube_seconds,
+                    'store_seconds': store_seconds,
+                })
+                print(f"  x{scale:<4} {region:<6} frame {frame_bytes / 1024 / 1024:8.1f} MB   "
+                      f"cube {cube_bytes / 1024:8.1f} KB {cube_seconds * 1000:8.3f} ms   "
+                      f"store {store.nbytes / 1024:8.1f} KB {store_seconds * 1000:8.3f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+# Child process that times the batch ETL over the inputs matching argv[1]
+ETL_PROBE = """
+import json, resource, sys, time
+import process_data
+files = process_data.discover_data_files(sys.argv[1])
+start = time.perf_counter()
+rows = len(process_data.process_batch(files, sys.argv[2]))
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'output_rows': rows,
+                  'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+# Child process that cold-starts the dashboard on the CSV at argv[1], then times
+# argv[2] uncached chart callbacks per region through the Dash HTTP endpoint
+DASHBOARD_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import dash_app
+dash_app.install_snapshot(dash_app.load_snapshot(sys.argv[1], parquet_path=None))
+client = dash_app.get_app().server.test_client()
+coldstart = time.perf_counter() - start
+coldstart_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def request(region):
+    inputs = [('region-filter', 'value', region), ('date-range', 'start_date', None),
+              ('date-range', 'end_date', None), ('granularity', 'value', 'day'), ('overlays', 'value', []),
+              ('product', 'value', 'pink morsel')]
+    body = {'output': 'sales-line-chart.figure',
+            'outputs': {'id': 'sales-line-chart', 'property': 'figure'},
+            'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+            'changedPropIds': ['region-filter.value']}
+    dash_app.figure_cache.clear()
+    response = client.post('/_dash-update-component', json=body)
+    assert response.status_code == 200, response.status_code
+
+latency = {}
+for region in ['all', 'north', 'south', 'east', 'west']:
+    request(region)  # first build of the region's chart template
+    timings = []
+    for _ in range(int(sys.argv[2])):
+        call_start = time.perf_counter()
+        request(region)
+        timings.append(time.perf_counter() - call_start)
+    latency[region] = timings
+print(json.dumps({'coldstart_seconds': coldstart, 'coldstart_rss': coldstart_rss, 'latency': latency}))
+"""
+
+
+def run_probe(code, *args):
+    """Run a probe script in a fresh interpreter and return the JSON it prints."""
+    env = dict(os.environ, DATA_RELOAD_INTERVAL='0', SHARED_CUBE_FILE='', DATA_BACKEND='csv')
+    result = subprocess.run(
+        [sys.executable, '-c', code, *[str(arg) for arg in args]],
+        capture_output=True, text=True, check=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def rss_mb(max_rss):
+    """Convert ``ru_maxrss`` (kilobytes on Linux, bytes on macOS) to megabytes."""
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def percentile_ms(timings, q):
+    import numpy as np
+
+    return float(np.percentile(timings, q)) * 1000
+
+
+def bench_suite(scales, requests=50):
+    """ETL throughput, peak RSS, dashboard cold start and callback latency per scale.
+
+    Each measurement runs in a fresh interpreter so peak RSS and cold start are
+    not affected by earlier runs.
+    """
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='soul_foods_bench_')
+
+    try:
+        for scale in scales:
+            scale_dir = os.path.join(work_dir, f'x{scale}')
+            data_files = make_synthetic_data(os.path.join(scale_dir, 'raw'), scale)
+            input_rows = count_rows(data_files)
+            output_file = os.path.join(scale_dir, 'formatted_data.csv')
+
+            etl = run_probe(ETL_PROBE, os.path.join(scale_dir, 'raw', '*.csv'), output_file)
+            dashboard = run_probe(DASHBOARD_PROBE, output_file, requests)
+
+            result = {
+                'scale': scale,
+                'input_rows': input_rows,
+                'etl_rows_per_sec': input_rows / etl['seconds'],
+                'etl_peak_rss_mb': rss_mb(etl['max_rss']),
+                'coldstart_seconds': dashboard['coldstart_seconds'],
+                'coldstart_peak_rss_mb': rss_mb(dashboard['coldstart_rss']),
+                'latency_ms': {
+                    region: {'p50': percentile_ms(timings, 50), 'p99': percentile_ms(timings, 99)}
+                    for region, timings in dashboard['latency'].items()
+                },
+            }
+            results.append(result)
+
+            print(f"  x{scale:<4} {input_rows:>10} rows  ETL {result['etl_rows_per_sec']:>12,.0f} rows/s "
+                  f"peak {result['etl_peak_rss_mb']:7.1f} MB   cold start {result['coldstart_seconds']:6.2f}s "
+                  f"peak {result['coldstart_peak_rss_mb']:7.1f} MB")
+            for region, latency in result['latency_ms'].items():
+                print(f"        {region:<6} callback p50 {latency['p50']:8.2f} ms   p99 {latency['p99']:8.2f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+
+
+def suite_metrics(result):
+    """Flatten one scale's suite result into ``{metric: (value, higher_is_better)}``."""
+    metrics = {
+        'etl_rows_per_sec': (result['etl_rows_per_sec'], True),
+        'etl_peak_rss_mb': (result['etl_peak_rss_mb'], False),
+        'coldstart_seconds': (result['coldstart_seconds'], False),
+        'coldstart_peak_rss_mb': (result['coldstart_peak_rss_mb'], False),
+    }
+    for region, latency in result['latency_ms'].items():
+        for stat, value in latency.items():
+            metrics[f'latency_{stat}_ms[{region}]'] = (value, False)
+    return metrics
+
+
+def compare_results(current, baseline, threshold=0.25):
+    """List the metrics in ``current`` that are worse than ``baseline`` by more than ``threshold``.
+
+    Both are ``bench_suite`` outputs; only scales and metrics present in both are
+    compared. Each regression is ``(scale, metric, baseline_value, current_value, change)``
+    where ``change`` is the relative change in the worse direction.
+    """
+    baseline_by_scale = {result['scale']: result for result in baseline['results']}
+    regressions = []
+
+    for result in current['results']:
+        base = baseline_by_scale.get(result['scale'])
+        if base is None:
+            continue
+        base_metrics = suite_metrics(base)
+        for metric, (value, higher_is_better) in suite_metrics(result).items():
+            if metric not in base_metrics or not base_metrics[metric][0]:
+                continue
+            base_value = base_metrics[metric][0]
+            change = (base_value - value) / base_value if higher_is_better else (value - base_value) / base_value
+            if change > threshold:
+                regressions.append((result['scale'], metric, base_value, value, change))
+
+    return regressions
+
+
+def report_regressions(regressions, threshold):
+    """Print regressions against the baseline. Returns the process exit code."""
+    if not regressions:
+        print(f"✅ No regressions beyond {threshold:.0%} of the baseline")
+        return 0
+    print(f"❌ {len(regressions)} regression(s) beyond {threshold:.0%} of the baseline:")
+    for scale, metric, base_value, value, change in regressions:
+        print(f"  x{scale:<4} {metric:<28} {base_value:14.2f} -> {value:14.2f} ({change:+.0%} worse)")
+    return 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Soul Foods data pipeline.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    workers = subparsers.add_parser('workers', help='ETL throughput vs. number of worker processes')
+    workers.add_argument('--scales', type=int, nargs='+', default=[10, 100],
+                         help='Synthetic input sizes as multiples of the bundled data')
+    workers.add_argument('--workers', type=int, nargs='+',
+                         default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                         help='Worker counts to compare')
+    workers.add_argument('--shard-mb', type=float, default=None,
+                         help='Split each input into byte-range shards of about this many MB')
+
+    dtypes = subparsers.add_parser('dtypes', help='Untyped vs. typed ingestion: rows/sec and peak memory')
+    dtypes.add_argument('--scales', type=int, nargs='+', default=[10, 100],
+                        help='Synthetic input sizes as multiples of the bundled data')
+
+    coldstart = subparsers.add_parser('coldstart', help='Dashboard data load time, CSV vs. Parquet vs. binary cache')
+    coldstart.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                           help='Synthetic data sizes as multiples of the bundled data')
+    coldstart.add_argument('--repeat', type=int, default=5, help='Take the best of this many loads')
+
+    figure = subparsers.add_parser('figure', help='Chart build latency, plotly express vs. template fast path')
+    figure.add_argument('--repeat', type=int, default=20, help='Take the best of this many builds')
+
+    startup = subparsers.add_parser('startup', help='dash_app import time (python -X importtime) and warm-up cost')
+    startup.add_argument('--top', type=int, default=10, help='Show this many slowest imported modules')
+
+    store = subparsers.add_parser('store', help='Memory and query latency, daily cube vs. series store')
+    store.add_argument('--scales', type=int, nargs='+', default=[1, 100],
+                       help='Synthetic data sizes as multiples of the bundled data')
+    store.add_argument('--repeat', type=int, default=200, help='Take the best of this many store queries')
+
+    suite = subparsers.add_parser('suite', help='ETL rows/sec and peak RSS, cold start and callback latency, to JSON')
+    suite.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                       help='Synthetic input sizes as multiples of the bundled data')
+    suite.add_argument('--requests', type=int, default=50, help='Timed chart callbacks per region')
+    suite.add_argument('--output', default='bench_results.json', help='Write the results to this JSON file')
+    suite.add_argument('--baseline', default=None, help='Fail if the results regress against this JSON file')
+    suite.add_argument('--threshold', type=float, default=0.25,
+                       help='Relative slowdown (or memory growth) that counts as a regression')
+
+    compare = subparsers.add_parser('compare', help='Compare two suite JSON files; fail on regressions')
+    compare.add_argument('results', help='Suite results to check')
+    compare.add_argument('baseline', help='Suite results to compare against')
+    compare.add_argument('--threshold', type=float, default=0.25,
+                         help='Relative slowdown (or memory growth) that counts as a regression')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.benchmark == 'workers':
+        print(f"📈 ETL throughput by worker count ({os.cpu_count()} CPUs available)")
+        bench_workers(args.scales, args.workers, args.shard_mb)
+    elif args.benchmark == 'dtypes':
+        print("🔬 Ingestion of one raw file with and without typed columns")
+        bench_dtypes(args.scales)
+    elif args.benchmark == 'coldstart':
+        print("🚀 Dashboard data load time from the CSV, formatted_data.parquet and formatted_data.cache")
+        bench_coldstart(args.scales, args.repeat)
+    elif args.benchmark == 'figure':
+        print("📊 Chart figure build + serialization latency")
+        bench_figure(args.repeat)
+    elif args.benchmark == 'startup':
+        print("⏱️  dash_app startup")
+        bench_startup(args.top)
+    elif args.benchmark == 'store':
+        print("🗄️  Per-region series queries: daily cube vs. array-backed store")
+        bench_store(args.scales, args.repeat)
+    elif args.benchmark == 'suite':
+        print("🏁 ETL and dashboard benchmark suite")
+        results = bench_suite(args.scales, args.requests)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            return report_regressions(compare_results(results, baseline, args.threshold), args.threshold)
+    elif args.benchmark == 'compare':
+        with open(args.results, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        return report_regressions(compare_results(results, baseline, args.threshold), args.threshold)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
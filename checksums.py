@@ -0,0 +1,16 @@
+"""
+Content hashes of data files.
+Shared by the ETL's incremental manifest and the dashboard's binary cache, which
+both tell a touched-but-unchanged file from a changed one by its SHA-256.
+"""
+
+import hashlib
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,162 +1,1419 @@
-import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.express as px
-import pandas as pd
+import base64
+import importlib.util
+import os
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime
 
-# Load the processed data
-df = pd.read_csv("formatted_data.csv")
+import instrumentation
+from figure_cache import MISSING, FigureCache
+from query_executor import QueryExecutor
 
-# Convert Date column to datetime
-df["Date"] = pd.to_datetime(df["Date"])
+# Fail on import when the dashboard's dependencies are missing, as an eager import
+# of them would. The heavy modules themselves are only imported on first use.
+for _module in ("dash", "pandas", "plotly"):
+    if importlib.util.find_spec(_module) is None:
+        raise ModuleNotFoundError(f"No module named '{_module}'", name=_module)
 
-# Create the Dash app
-app = dash.Dash(__name__)
+DATA_FILE = "formatted_data.csv"
+PARQUET_FILE = "formatted_data.parquet"
+SQLITE_FILE = "formatted_data.db"
 
-# Define custom CSS styles
-app.layout = html.Div(
-    [
-        # Header section with gradient background
-        html.Div(
-            [
-                html.H1(
-                    "Soul Foods Pink Morsel Sales Analysis",
-                    style={
-                        "textAlign": "center",
-                        "marginBottom": "10px",
-                        "color": "white",
-                        "fontFamily": "Arial, sans-serif",
-                        "fontSize": "2.5rem",
-                        "fontWeight": "bold",
-                        "textShadow": "2px 2px 4px rgba(0,0,0,0.3)",
-                    },
-                ),
-                html.P(
-                    "Impact of Price Increase on January 15th, 2021",
-                    style={
-                        "textAlign": "center",
-                        "fontSize": "1.2rem",
-                        "color": "#f8f9fa",
-                        "fontFamily": "Arial, sans-serif",
-                        "marginBottom": "0px",
-                        "fontStyle": "italic",
-                    },
+# The product formatted_data.csv holds. Other products are read from their own
+# partitions, written by ``process_data.py --partitioned``
+PRODUCT = "pink morsel"
+PARTITION_DIR = "formatted_partitions"
+
+# Weekly and monthly rollups written by process_data.py next to the CSV
+ROLLUP_FILE = "formatted_rollups.csv"
+
+# Chart granularities and how they are named in titles and labels
+PERIOD_LABELS = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+# Where chart data comes from: "csv" loads the formatted CSV into memory, "sqlite"
+# queries the indexed store written by ``process_data.py --sqlite`` per request
+DATA_BACKEND = os.environ.get("DATA_BACKEND", "csv")
+
+# Date of the Pink Morsel price increase, marked on the chart
+PRICE_INCREASE_DATE = datetime(2021, 1, 15)
+
+# Change dates marked on the chart with their windowed before/after impact,
+# e.g. EVENT_DATES=2021-01-15,2021-06-01
+EVENT_DATES = [
+    datetime.fromisoformat(date.strip())
+    for date in os.environ.get("EVENT_DATES", PRICE_INCREASE_DATE.date().isoformat()).split(",")
+    if date.strip()
+]
+
+# Days either side of each event compared by its chart marker
+EVENT_WINDOW_DAYS = int(os.environ.get("EVENT_WINDOW_DAYS", "30"))
+
+# Optional lines drawn over the daily chart: rolling means and a trend line
+OVERLAY_STYLES = {
+    "rolling-7": {"name": "7-day average", "color": "#f39c12"},
+    "rolling-30": {"name": "30-day average", "color": "#27ae60"},
+    "rolling-90": {"name": "90-day average", "color": "#34495e"},
+    "trend": {"name": "Trend", "color": "#95a5a6"},
+}
+
+# Most points sent to the browser per chart line; longer series are downsampled
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", "2000"))
+
+# Memory-mapped binary copy of the loaded data, written next to the CSV on first load
+# (formatted_data.cache) and rebuilt when the CSV changes. DATA_CACHE=0 turns it off
+DATA_CACHE = os.environ.get("DATA_CACHE", "1") != "0"
+CACHE_SUFFIX = ".cache"
+
+# Layout version of the cache file; files of any other version are rebuilt
+CACHE_FORMAT = 1
+
+# Memory-mapped daily cube shared by every worker process (see build_shared_cube)
+SHARED_CUBE_FILE = os.environ.get("SHARED_CUBE_FILE")
+
+# Serve the chart callback as a coroutine: "1" requires dash[async], "0" turns it
+# off, and the default "auto" uses it when dash[async] (asgiref) is installed
+DASH_ASYNC = os.environ.get("DASH_ASYNC", "auto")
+
+# Threads that run chart queries off the request thread
+QUERY_WORKERS = int(os.environ.get("QUERY_WORKERS", "4"))
+
+# Seconds between checks of the data file for changes
+RELOAD_INTERVAL = float(os.environ.get("DATA_RELOAD_INTERVAL", "5"))
+
+# Keep the row-level frame in every snapshot. Charts never read it, and it dwarfs the
+# per-region series, so by default it is only loaded when ``dash_app.df`` is read
+# (see ``row_data``); KEEP_ROW_DATA=1 keeps it loaded alongside each snapshot
+KEEP_ROW_DATA = os.environ.get("KEEP_ROW_DATA", "0") == "1"
+
+# Opt-in sampling profiler: folded stacks are written here when the process exits
+PROFILE_FILE = os.environ.get("PROFILE_FILE")
+
+# Everything derived from one version of the data file. Snapshots are never
+# modified after they are built; a reload builds a new one and swaps it in.
+# ``rollups`` maps "week" and "month" to cubes like ``daily_sales``, and ``series``
+# is the daily cube as a compact ``series_store.SeriesStore`` for chart queries.
+# With the SQLite backend only ``store`` is set and charts query it directly.
+# ``product`` names the product the data is for (see ``product_snapshot``), and
+# ``df`` holds the row-level frame only with KEEP_ROW_DATA (see ``row_data``).
+DataSnapshot = namedtuple(
+    "DataSnapshot",
+    ["version", "df", "daily_sales", "store", "rollups", "series", "product"],
+    defaults=(None, None, None, PRODUCT),
+)
+
+
+def file_version(path=DATA_FILE):
+    """Identify a version of the data file by its modification time and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_data(csv_path=DATA_FILE, parquet_path=PARQUET_FILE):
+    """Load the processed sales data, preferring the typed columnar copy.
+
+    formatted_data.parquet (written by ``process_data.py --parquet``) already has a
+    date-typed Date column, so it skips text parsing and ``pd.to_datetime``. It is
+    only used while it is at least as new as the CSV and pyarrow is installed.
+    """
+    if parquet_path and os.path.exists(parquet_path) and (
+        os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    ):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            pass
+        else:
+            return pq.read_table(parquet_path).to_pandas(date_as_object=False)
+
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+
+    # Convert Date column to datetime
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def build_daily_cube(df):
+    """Precompute total daily sales as a Date x Region table, plus an "all" column.
+
+    Each region column holds exactly what ``df[df["Region"] == region].groupby("Date")``
+    would sum to, NaN on dates the region has no rows. "all" is grouped from the raw
+    rows rather than summed across columns so it matches the all-regions groupby.
+    """
+    cube = df.groupby(["Date", "Region"], observed=True)["Sales"].sum().unstack("Region")
+    cube.columns = cube.columns.astype(str)
+    cube["all"] = df.groupby("Date")["Sales"].sum()
+    return cube.sort_index()
+
+
+def slice_dates(cube, start_date=None, end_date=None):
+    """Rows of the date-sorted cube from ``start_date`` to ``end_date`` inclusive.
+
+    Bounds are found by binary search on the sorted index, so a range costs
+    O(log n + k) rather than a boolean mask over every row. Missing bounds are open.
+    """
+    import pandas as pd
+
+    start = cube.index.searchsorted(pd.Timestamp(start_date), side="left") if start_date else 0
+    end = cube.index.searchsorted(pd.Timestamp(end_date), side="right") if end_date else len(cube)
+    return cube.iloc[start:end]
+
+
+def region_daily_sales(cube, region):
+    """Slice one region's daily totals from the cube as a Date/Sales frame."""
+    import pandas as pd
+
+    if region not in cube.columns:
+        return pd.DataFrame({"Date": cube.index[:0], "Sales": pd.Series(dtype="float64")})
+    return cube[region].dropna().rename("Sales").reset_index()
+
+
+def load_rollups(cube, csv_path=DATA_FILE):
+    """Weekly and monthly rollups of a daily cube, as ``{granularity: cube}``.
+
+    They are read from the rollup file process_data.py writes next to the CSV while
+    it is at least as new as the CSV, and otherwise summed from the daily cube.
+    Either way the raw rows are never re-aggregated.
+    """
+    from rollups import build_rollups, read_rollups
+
+    rollup_path = os.path.join(os.path.dirname(csv_path), ROLLUP_FILE)
+    if os.path.exists(rollup_path) and os.path.getmtime(rollup_path) >= os.path.getmtime(csv_path):
+        return read_rollups(rollup_path)
+    return build_rollups(cube)
+
+
+def write_cube(cube, path, source_version):
+    """Write a daily cube to a memory-mappable file tagged with its source data version."""
+    from mmap_store import write_arrays
+
+    write_arrays(
+        path,
+        {
+            "dates": cube.index.to_numpy(dtype="datetime64[ns]").view("int64"),
+            "values": cube.to_numpy(dtype="float64"),
+        },
+        meta={"source_version": source_version, "columns": [str(c) for c in cube.columns]},
+    )
+
+
+def map_cube(path):
+    """Map a cube file read-only. Returns ``(source_version, cube)``.
+
+    The cube's values are a view of the mapped file, not a copy, so every process
+    mapping the same file shares one copy of the data.
+    """
+    from mmap_store import map_arrays
+
+    meta, arrays = map_arrays(path)
+    cube = mapped_cube(arrays["dates"].view("datetime64[ns]"), arrays["values"], meta["columns"])
+    return meta["source_version"], cube
+
+
+def mapped_cube(dates, values, columns):
+    """A Date x Region cube over mapped arrays, without copying them."""
+    import pandas as pd
+
+    return pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(dates, name="Date"),
+        columns=pd.Index(columns, name="Region"),
+        copy=False,
+    )
+
+
+def build_shared_cube(csv_path=DATA_FILE, parquet_path=PARQUET_FILE, cube_path=SHARED_CUBE_FILE):
+    """Load the data once and write the daily cube for worker processes to map.
+
+    Run it in the loader process before workers start, e.g. from gunicorn's
+    ``on_starting`` hook, or with ``python dash_app.py --build-shared-cube PATH``.
+    """
+    version = file_version(csv_path)
+    write_cube(build_daily_cube(load_data(csv_path, parquet_path)), cube_path, version)
+    return version
+
+
+def shared_cube_version(path):
+    """Source data version recorded in a shared cube file, or None if there isn't one."""
+    from mmap_store import read_header
+
+    try:
+        return read_header(path)[0].get("source_version")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def cache_path(csv_path=DATA_FILE):
+    """The binary cache file kept next to a CSV, e.g. formatted_data.cache."""
+    return os.path.splitext(csv_path)[0] + CACHE_SUFFIX
+
+
+def write_data_cache(df, cube, rollups, path, source):
+    """Write loaded rows, their daily cube and rollups to a memory-mappable cache file.
+
+    ``source`` identifies the CSV they were loaded from, as its ``file_version`` and
+    SHA-256. Rows are stored column by column, Region as category codes.
+    """
+    import pandas as pd
+    from mmap_store import write_arrays
+
+    regions = pd.Categorical(df["Region"])
+    arrays = {
+        "sales": df["Sales"].to_numpy(dtype="float64"),
+        "dates": df["Date"].to_numpy(),
+        "regions": regions.codes,
+        "cube_dates": cube.index.to_numpy(),
+        "cube_values": cube.to_numpy(dtype="float64"),
+    }
+    for granularity, rollup in rollups.items():
+        arrays[f"{granularity}_dates"] = rollup.index.to_numpy()
+        arrays[f"{granularity}_values"] = rollup.to_numpy(dtype="float64")
+
+    write_arrays(path, arrays, meta=dict(
+        source,
+        format=CACHE_FORMAT,
+        regions=[str(region) for region in regions.categories],
+        columns=[str(column) for column in cube.columns],
+        rollup_columns={granularity: [str(c) for c in rollup.columns] for granularity, rollup in rollups.items()},
+    ))
+
+
+def map_data_cache(path, csv_path=DATA_FILE, rows=None):
+    """Map the cache of ``csv_path``. Returns ``(df, cube, rollups)``, or None if it is missing or stale.
+
+    ``df`` is None unless ``rows`` (by default ``KEEP_ROW_DATA``) asks for the rows.
+
+    The cache is current when it was written for the CSV's ``file_version``, or, if
+    only the modification time moved, for a CSV with the same SHA-256. In that case
+    the cache is rewritten for the new ``file_version``, so later loads skip the hash.
+    The frames are views of the mapped file, so mapping takes the same time whatever
+    the row count.
+    """
+    import numpy as np
+    import pandas as pd
+    from mmap_store import map_arrays, read_header, write_arrays
+
+    try:
+        meta = read_header(path)[0]
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get("format") != CACHE_FORMAT:
+        return None
+    version = file_version(csv_path)
+    if meta.get("source_version") != version:
+        from checksums import file_hash
+
+        if meta.get("sha256") != file_hash(csv_path):
+            return None
+        # Same rows under a new stat: re-tag the cache (the old mapping stays valid)
+        meta, arrays = map_arrays(path)
+        try:
+            write_arrays(path, arrays, meta=dict(meta, source_version=version))
+        except OSError:
+            pass
+
+    meta, arrays = map_arrays(path)
+    df = None
+    if KEEP_ROW_DATA if rows is None else rows:
+        df = pd.DataFrame(
+            {
+                "Sales": arrays["sales"],
+                "Date": arrays["dates"],
+                # A plain ndarray view of the codes, so Region is the same as when loaded from the CSV
+                "Region": pd.Categorical.from_codes(
+                    np.asarray(arrays["regions"]), dtype=pd.CategoricalDtype(meta["regions"])
                 ),
-            ],
-            style={
-                "background": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-                "padding": "40px 20px",
-                "marginBottom": "30px",
-                "borderRadius": "0 0 20px 20px",
-                "boxShadow": "0 4px 15px rgba(0,0,0,0.2)",
-            },
-        ),
-        # Control panel
-        html.Div(
-            [
-                html.Div(
-                    [
-                        html.H3(
-                            "Filter by Region",
-                            style={
-                                "color": "#2c3e50",
-                                "fontFamily": "Arial, sans-serif",
-                                "marginBottom": "15px",
-                                "fontSize": "1.3rem",
-                            },
-                        ),
-                        dcc.RadioItems(
-                            id="region-filter",
-                            options=[
-                                {"label": "🌍 All Regions", "value": "all"},
-                                {"label": "⬆️ North", "value": "north"},
-                                {"label": "⬇️ South", "value": "south"},
-                                {"label": "➡️ East", "value": "east"},
-                                {"label": "⬅️ West", "value": "west"},
-                            ],
-                            value="all",
-                            style={
-                                "fontFamily": "Arial, sans-serif",
-                                "fontSize": "1.1rem",
-                            },
-                            inputStyle={
-                                "marginRight": "8px",
-                                "transform": "scale(1.2)",
-                            },
-                            labelStyle={
-                                "display": "block",
-                                "marginBottom": "10px",
-                                "padding": "8px 15px",
-                                "backgroundColor": "#f8f9fa",
-                                "borderRadius": "8px",
-                                "border": "2px solid #e9ecef",
-                                "cursor": "pointer",
-                                "transition": "all 0.3s ease",
-                            },
-                        ),
-                    ],
-                    style={
-                        "backgroundColor": "white",
-                        "padding": "25px",
-                        "borderRadius": "15px",
-                        "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
-                        "border": "1px solid #e9ecef",
-                    },
-                )
-            ],
-            style={"width": "300px", "margin": "0 auto 30px auto"},
-        ),
-        # Chart container
-        html.Div(
-            [dcc.Graph(id="sales-line-chart", style={"height": "600px"})],
-            style={
-                "backgroundColor": "white",
-                "padding": "25px",
-                "borderRadius": "15px",
-                "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
-                "border": "1px solid #e9ecef",
-                "margin": "0 20px",
             },
+            copy=False,
+        )
+    cube = mapped_cube(arrays["cube_dates"], arrays["cube_values"], meta["columns"])
+    rollups = {
+        granularity: mapped_cube(arrays[f"{granularity}_dates"], arrays[f"{granularity}_values"], columns)
+        for granularity, columns in meta["rollup_columns"].items()
+    }
+    return df, cube, rollups
+
+
+def load_cached_data(csv_path=DATA_FILE, parquet_path=PARQUET_FILE):
+    """The CSV's rows, daily cube and rollups, mapped from its binary cache when current.
+
+    A missing or stale cache is rebuilt from the CSV (or its Parquet copy) and
+    written for the next process; if it can't be written the data is still served.
+    """
+    path = cache_path(csv_path)
+    if DATA_CACHE:
+        cached = map_data_cache(path, csv_path)
+        if cached is not None:
+            return cached
+
+    # Identify the source before reading it; if it changes mid-load, the cache is stale
+    source = {"source_version": file_version(csv_path)}
+    if DATA_CACHE:
+        from checksums import file_hash
+
+        source["sha256"] = file_hash(csv_path)
+
+    df = load_data(csv_path, parquet_path)
+    # Region is categorical whichever way the rows are loaded, as in the cache
+    df["Region"] = df["Region"].astype("category")
+    cube = build_daily_cube(df)
+    rollups = load_rollups(cube, csv_path)
+    if DATA_CACHE:
+        try:
+            write_data_cache(df, cube, rollups, path, source)
+        except OSError:
+            pass
+    return df, cube, rollups
+
+
+def source_file(csv_path=DATA_FILE):
+    """The file the selected ``DATA_BACKEND`` reads, and whose version is served."""
+    return SQLITE_FILE if DATA_BACKEND == "sqlite" else csv_path
+
+
+def load_snapshot(csv_path=DATA_FILE, parquet_path=PARQUET_FILE, shared_path=None):
+    """Load the data file and precompute everything the callbacks read from it; see ``_load_snapshot``."""
+    with instrumentation.span("data.load_snapshot", backend=DATA_BACKEND):
+        return _load_snapshot(csv_path, parquet_path, shared_path)
+
+
+def _load_snapshot(csv_path=DATA_FILE, parquet_path=PARQUET_FILE, shared_path=None):
+    """Load the data file and precompute everything the callbacks read from it.
+
+    With a shared cube file (``shared_path`` or ``SHARED_CUBE_FILE``), the cube is
+    mapped from it instead and the row-level ``df`` is not kept in this process.
+    A missing or stale shared file is rebuilt first.
+
+    With the SQLite backend nothing is loaded; the snapshot just opens the store.
+    """
+    from series_store import SeriesStore
+
+    if DATA_BACKEND == "sqlite":
+        from sales_store import SqliteSalesStore
+
+        return DataSnapshot(file_version(SQLITE_FILE), None, None, SqliteSalesStore(SQLITE_FILE))
+
+    # Take the version first: if the file changes mid-load, the next check reloads
+    version = file_version(csv_path)
+
+    shared_path = shared_path or SHARED_CUBE_FILE
+    if shared_path:
+        if shared_cube_version(shared_path) != version:
+            build_shared_cube(csv_path, parquet_path, shared_path)
+        shared_version, cube = map_cube(shared_path)
+        return DataSnapshot(
+            shared_version, None, cube, rollups=load_rollups(cube, csv_path), series=SeriesStore.from_cube(cube)
+        )
+
+    df, cube, rollups = load_cached_data(csv_path, parquet_path)
+    return DataSnapshot(
+        version,
+        df if KEEP_ROW_DATA else None,
+        cube,
+        rollups=rollups,
+        series=SeriesStore.from_cube(cube),
+    )
+
+
+# The snapshot served to new requests; loaded on first use
+_snapshot = None
+_reload_lock = threading.Lock()
+
+
+def install_snapshot(new_snapshot):
+    """Make ``new_snapshot`` the one served to new requests."""
+    global _snapshot
+
+    # A single reference assignment is atomic, so readers see either the old
+    # snapshot or the new one, never a mix
+    _snapshot = new_snapshot
+
+
+def get_snapshot():
+    """Return the current data snapshot, loading the data on first use."""
+    current = _snapshot
+    if current is None:
+        with _reload_lock:
+            current = _snapshot
+            if current is None:
+                current = load_snapshot()
+                install_snapshot(current)
+    return current
+
+
+# Snapshots of other products, loaded from their partitions on first use and
+# keyed by (data version, product)
+_product_snapshots = {}
+# Guards the two dicts; each key's own lock is held while its partition loads, so a
+# slow first load of one product doesn't hold up requests for any other
+_product_lock = threading.Lock()
+_product_key_locks = {}
+
+
+def available_products(partition_dir=None):
+    """Products the dashboard can chart: ``PRODUCT`` and those partitioned with the current CSV."""
+    from partitions import partition_products
+
+    products = partition_products(partition_dir or PARTITION_DIR, DATA_FILE)
+    return products if PRODUCT in products else [PRODUCT] + products
+
+
+def product_snapshot(current, product, partition_dir=None):
+    """The snapshot for ``product`` alongside ``current``, which is returned for its own product.
+
+    Other products are loaded from their partition only, so the first request for a
+    product reads that product's files and none of the others. The result is kept
+    until the data version changes. Partitions only count while they were written
+    with the CSV now on disk; a product without current ones (a stale picker value,
+    or an ETL run without ``--partitioned``) is served ``current`` instead.
+    """
+    if not product or product == current.product:
+        return current
+
+    key = (current.version, product)
+    with _product_lock:
+        snap = _product_snapshots.get(key)
+        if snap is not None:
+            return snap
+        key_lock = _product_key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _product_lock:
+            snap = _product_snapshots.get(key)
+        if snap is not None:
+            return snap
+
+        from partitions import read_partition
+        from rollups import build_rollups
+        from series_store import SeriesStore
+
+        try:
+            with instrumentation.span("data.load_partition", product=product):
+                cube = build_daily_cube(read_partition(product, partition_dir or PARTITION_DIR, DATA_FILE))
+        except KeyError:
+            return current
+        snap = DataSnapshot(
+            current.version, None, cube, rollups=build_rollups(cube), series=SeriesStore.from_cube(cube),
+            product=product,
+        )
+
+    with _product_lock:
+        # Products of older data versions are never served again
+        for stale in [k for k in _product_snapshots if k[0] != current.version]:
+            del _product_snapshots[stale]
+        for stale in [k for k in _product_key_locks if k[0] != current.version]:
+            del _product_key_locks[stale]
+        _product_snapshots[key] = snap
+    return snap
+
+
+# Row-level frame of the current data version, when snapshots don't keep it
+_row_data = FigureCache(maxsize=1)
+
+
+def row_data(current=None):
+    """The row-level Sales/Date/Region frame of a snapshot (by default the current one).
+
+    Snapshots only hold it with ``KEEP_ROW_DATA``. Otherwise it is read from
+    ``DATA_FILE`` on first access, mapped from its binary cache when that is current,
+    and kept until the data version changes.
+    """
+    current = current or get_snapshot()
+    if current.df is not None:
+        return current.df
+
+    def build():
+        if DATA_CACHE:
+            cached = map_data_cache(cache_path(DATA_FILE), DATA_FILE, rows=True)
+            if cached is not None:
+                return cached[0]
+        df = load_data(DATA_FILE, PARQUET_FILE)
+        df["Region"] = df["Region"].astype("category")
+        return df
+
+    return _row_data.get_or_build("df", current.version, build)
+
+
+def refresh_data(csv_path=DATA_FILE, parquet_path=PARQUET_FILE):
+    """Reload the data if the file has changed. Returns True when a new snapshot is installed."""
+    with _reload_lock:
+        try:
+            version = file_version(source_file(csv_path))
+        except FileNotFoundError:
+            # The file is being replaced; keep serving the current snapshot
+            return False
+        if _snapshot is not None and version == _snapshot.version:
+            return False
+        install_snapshot(load_snapshot(csv_path, parquet_path))
+        return True
+
+
+def watch_data_file(interval=RELOAD_INTERVAL):
+    """Poll the data file forever, swapping in new snapshots as it changes."""
+    while True:
+        time.sleep(interval)
+        try:
+            refresh_data()
+        except Exception as e:
+            # A bad file must not kill the watcher; keep the last good snapshot
+            print(f"❌ Error reloading {source_file()}: {e}")
+
+
+_watcher = None
+# Only guards starting the watcher; runs before every request, so it must never
+# wait on _reload_lock, which a reload holds while it loads the data
+_watcher_lock = threading.Lock()
+
+
+def start_data_watcher(interval=RELOAD_INTERVAL):
+    """Start the background data watcher once per process."""
+    global _watcher
+    if _watcher is not None or interval <= 0:
+        return
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=watch_data_file, args=(interval,), daemon=True)
+            _watcher.start()
+
+
+def downsample_daily_sales(data, max_points=CHART_MAX_POINTS):
+    """Reduce a Date/Sales series to at most about ``max_points`` points with LTTB.
+
+    The points either side of the price increase and every other event date are
+    always kept so the chart's before/after steps are drawn exactly.
+    """
+    import pandas as pd
+    from downsampling import downsample_indices
+
+    x = data["Date"].to_numpy(dtype="datetime64[ns]").view("int64")
+    breakpoints = [pd.Timestamp(date).value for date in sorted({PRICE_INCREASE_DATE, *EVENT_DATES})]
+    keep = downsample_indices(x, data["Sales"].to_numpy(), max_points, breakpoints=breakpoints)
+    return data.iloc[keep].reset_index(drop=True)
+
+
+# Bytes per date in a chart payload: a quoted ISO timestamp and its separator
+ISO_DATE_BYTES = len('"2021-01-15T00:00:00",')
+
+
+def series_payload_bytes(data):
+    """Size of a Date/Sales series as sent to the browser, from its length alone.
+
+    Dates go as ISO strings and sales as a base64 float64 array (see ``build_chart``),
+    so nothing needs to be encoded just to measure it.
+    """
+    values_bytes = len(data) * 8
+    return len(data) * ISO_DATE_BYTES + (values_bytes + 2) // 3 * 4
+
+
+# Chart payload size before and after downsampling, from the last build of each
+# "product/region/granularity" chart line (see ``payload_key``). Written from the
+# query pool's threads, so only touched under its lock
+payload_stats = {}
+_payload_lock = threading.Lock()
+
+
+# Built figures, keyed by request inputs and invalidated by a new data version
+figure_cache = FigureCache(maxsize=32)
+
+# Chart queries run here; concurrent requests for the same chart share one build
+query_executor = QueryExecutor(max_workers=QUERY_WORKERS)
+
+# Price increase impact statistics, computed once per data version
+impact_cache = FigureCache(maxsize=4)
+
+
+def build_layout():
+    """Build the page layout: header, controls, chart, impact summary and footer."""
+    from dash import dcc, html
+
+    # Define custom CSS styles
+    return html.Div(
+        [
+            # Header section with gradient background
+            html.Div(
+                [
+                    html.H1(
+                        "Soul Foods Pink Morsel Sales Analysis",
+                        style={
+                            "textAlign": "center",
+                            "marginBottom": "10px",
+                            "color": "white",
+                            "fontFamily": "Arial, sans-serif",
+                            "fontSize": "2.5rem",
+                            "fontWeight": "bold",
+                            "textShadow": "2px 2px 4px rgba(0,0,0,0.3)",
+                        },
+                    ),
+                    html.P(
+                        "Impact of Price Increase on January 15th, 2021",
+                        style={
+                            "textAlign": "center",
+                            "fontSize": "1.2rem",
+                            "color": "#f8f9fa",
+                            "fontFamily": "Arial, sans-serif",
+                            "marginBottom": "0px",
+                            "fontStyle": "italic",
+                        },
+                    ),
+                ],
+                style={
+                    "background": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+                    "padding": "40px 20px",
+                    "marginBottom": "30px",
+                    "borderRadius": "0 0 20px 20px",
+                    "boxShadow": "0 4px 15px rgba(0,0,0,0.2)",
+                },
+            ),
+            # Control panel
+            html.Div(
+                [
+                    html.Div(
+                        [
+                            html.H3(
+                                "Filter by Region",
+                                style={
+                                    "color": "#2c3e50",
+                                    "fontFamily": "Arial, sans-serif",
+                                    "marginBottom": "15px",
+                                    "fontSize": "1.3rem",
+                                },
+                            ),
+                            dcc.RadioItems(
+                                id="region-filter",
+                                options=[
+                                    {"label": "🌍 All Regions", "value": "all"},
+                                    {"label": "⬆️ North", "value": "north"},
+                                    {"label": "⬇️ South", "value": "south"},
+                                    {"label": "➡️ East", "value": "east"},
+                                    {"label": "⬅️ West", "value": "west"},
+                                ],
+                                value="all",
+                                style={
+                                    "fontFamily": "Arial, sans-serif",
+                                    "fontSize": "1.1rem",
+                                },
+                                inputStyle={
+                                    "marginRight": "8px",
+                                    "transform": "scale(1.2)",
+                                },
+                                labelStyle={
+                                    "display": "block",
+                                    "marginBottom": "10px",
+                                    "padding": "8px 15px",
+                                    "backgroundColor": "#f8f9fa",
+                                    "borderRadius": "8px",
+                                    "border": "2px solid #e9ecef",
+                                    "cursor": "pointer",
+                                    "transition": "all 0.3s ease",
+                                },
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "25px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                            "border": "1px solid #e9ecef",
+                            "marginBottom": "20px",
+                        },
+                    ),
+                    html.Div(
+                        [
+                            html.H3(
+                                "Product",
+                                style={
+                                    "color": "#2c3e50",
+                                    "fontFamily": "Arial, sans-serif",
+                                    "marginBottom": "15px",
+                                    "fontSize": "1.3rem",
+                                },
+                            ),
+                            dcc.Dropdown(
+                                id="product",
+                                options=[{"label": PRODUCT.title(), "value": PRODUCT}],
+                                value=PRODUCT,
+                                clearable=False,
+                                style={"fontFamily": "Arial, sans-serif"},
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "25px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                            "border": "1px solid #e9ecef",
+                            "marginBottom": "20px",
+                        },
+                    ),
+                    html.Div(
+                        [
+                            html.H3(
+                                "Filter by Date",
+                                style={
+                                    "color": "#2c3e50",
+                                    "fontFamily": "Arial, sans-serif",
+                                    "marginBottom": "15px",
+                                    "fontSize": "1.3rem",
+                                },
+                            ),
+                            dcc.DatePickerRange(
+                                id="date-range",
+                                display_format="YYYY-MM-DD",
+                                start_date_placeholder_text="Start",
+                                end_date_placeholder_text="End",
+                                clearable=True,
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "25px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                            "border": "1px solid #e9ecef",
+                            "marginBottom": "20px",
+                        },
+                    ),
+                    html.Div(
+                        [
+                            html.H3(
+                                "Granularity",
+                                style={
+                                    "color": "#2c3e50",
+                                    "fontFamily": "Arial, sans-serif",
+                                    "marginBottom": "15px",
+                                    "fontSize": "1.3rem",
+                                },
+                            ),
+                            dcc.RadioItems(
+                                id="granularity",
+                                options=[
+                                    {"label": label, "value": value}
+                                    for value, label in PERIOD_LABELS.items()
+                                ],
+                                value="day",
+                                inline=True,
+                                style={
+                                    "fontFamily": "Arial, sans-serif",
+                                    "fontSize": "1.1rem",
+                                },
+                                inputStyle={"marginRight": "6px"},
+                                labelStyle={"marginRight": "15px", "cursor": "pointer"},
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "25px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                            "border": "1px solid #e9ecef",
+                            "marginBottom": "20px",
+                        },
+                    ),
+                    html.Div(
+                        [
+                            html.H3(
+                                "Overlays",
+                                style={
+                                    "color": "#2c3e50",
+                                    "fontFamily": "Arial, sans-serif",
+                                    "marginBottom": "15px",
+                                    "fontSize": "1.3rem",
+                                },
+                            ),
+                            dcc.Checklist(
+                                id="overlays",
+                                options=[
+                                    {"label": style["name"], "value": value}
+                                    for value, style in OVERLAY_STYLES.items()
+                                ],
+                                value=[],
+                                style={
+                                    "fontFamily": "Arial, sans-serif",
+                                    "fontSize": "1.1rem",
+                                },
+                                inputStyle={"marginRight": "8px"},
+                                labelStyle={"display": "block", "marginBottom": "6px", "cursor": "pointer"},
+                            ),
+                            html.P(
+                                "Shown on the daily chart",
+                                style={"color": "#6c757d", "fontSize": "0.85rem", "marginBottom": "0px"},
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "25px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                            "border": "1px solid #e9ecef",
+                        },
+                    ),
+                ],
+                style={"width": "300px", "margin": "0 auto 30px auto"},
+            ),
+            # Chart container
+            html.Div(
+                [dcc.Graph(id="sales-line-chart", style={"height": "600px"})],
+                style={
+                    "backgroundColor": "white",
+                    "padding": "25px",
+                    "borderRadius": "15px",
+                    "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                    "border": "1px solid #e9ecef",
+                    "margin": "0 20px",
+                },
+            ),
+            # Price increase impact summary
+            html.Div(
+                [
+                    html.H3(
+                        "Price Increase Impact",
+                        style={
+                            "color": "#2c3e50",
+                            "fontFamily": "Arial, sans-serif",
+                            "marginBottom": "15px",
+                            "fontSize": "1.3rem",
+                        },
+                    ),
+                    html.Div(id="impact-summary"),
+                ],
+                style={
+                    "backgroundColor": "white",
+                    "padding": "25px",
+                    "borderRadius": "15px",
+                    "boxShadow": "0 4px 15px rgba(0,0,0,0.1)",
+                    "border": "1px solid #e9ecef",
+                    "margin": "30px 20px 0 20px",
+                },
+            ),
+            # Footer
+            html.Div(
+                [
+                    html.P(
+                        "📊 Data-driven insights for better business decisions",
+                        style={
+                            "textAlign": "center",
+                            "color": "#6c757d",
+                            "fontFamily": "Arial, sans-serif",
+                            "fontSize": "0.9rem",
+                            "fontStyle": "italic",
+                        },
+                    )
+                ],
+                style={"marginTop": "30px", "padding": "20px"},
+            ),
+        ],
+        style={
+            "backgroundColor": "#f8f9fa",
+            "minHeight": "100vh",
+            "fontFamily": "Arial, sans-serif",
+        },
+    )
+
+
+def dash_supports_async():
+    """Whether the installed Dash accepts ``use_async`` (Dash 3 and later); Dash 2 rejects it."""
+    import inspect
+
+    import dash
+
+    return "use_async" in inspect.signature(dash.Dash.__init__).parameters
+
+
+def create_app(use_async=None):
+    """App factory: build the Dash app with its layout, callbacks and monitoring routes.
+
+    ``use_async`` selects the async chart callback; None follows ``DASH_ASYNC``, whose
+    "auto" uses it only when the installed Dash supports it and asgiref is present.
+    Building the app does not load any data; that happens on the first callback
+    or in ``warm_up()``.
+    """
+    import dash
+    from dash import Input, Output
+
+    if use_async is None:
+        use_async = DASH_ASYNC == "1" or (
+            DASH_ASYNC == "auto" and importlib.util.find_spec("asgiref") is not None and dash_supports_async()
+        )
+    if use_async and not dash_supports_async():
+        raise RuntimeError(f"The async chart callback needs Dash 3 or later; Dash {dash.__version__} is installed")
+
+    # Older Dash versions have no async support (nor the argument)
+    app = dash.Dash(__name__, use_async=True) if use_async else dash.Dash(__name__)
+
+    # Start watching the data file in each serving process (after any worker fork)
+    app.server.before_request(start_data_watcher)
+
+    app.layout = build_layout()
+
+    chart_outputs = (
+        Output("sales-line-chart", "figure"),
+        Input("region-filter", "value"),
+        Input("date-range", "start_date"),
+        Input("date-range", "end_date"),
+        Input("granularity", "value"),
+        Input("overlays", "value"),
+        Input("product", "value"),
+    )
+
+    # Callback for updating the chart based on region, date range, granularity and
+    # overlays. With async support (dash[async]) the request awaits the query instead
+    # of blocking.
+    if use_async:
+        @app.callback(*chart_outputs)
+        async def update_chart_callback(selected_region, start_date, end_date, granularity, overlays, product):
+            return await update_chart_async(selected_region, start_date, end_date, granularity, overlays, product)
+    else:
+        @app.callback(*chart_outputs)
+        def update_chart_callback(selected_region, start_date, end_date, granularity, overlays, product):
+            return update_chart(selected_region, start_date, end_date, granularity, overlays, product)
+
+    # Impact summary, with the selected region's row highlighted
+    @app.callback(
+        Output("impact-summary", "children"), Input("region-filter", "value"), Input("product", "value")
+    )
+    def update_impact_callback(selected_region, product):
+        return update_impact_summary(selected_region, product)
+
+    # Product choices, read from the partition index when the page loads
+    @app.callback(Output("product", "options"), Input("product", "id"))
+    def update_product_options(_):
+        return product_options()
+
+    @app.server.route("/_figure_cache")
+    def figure_cache_stats():
+        # Hit/miss counters for checking the cache under load
+        return figure_cache.stats()
+
+    @app.server.route("/_metrics")
+    def metrics():
+        # Timing spans and row counters (SALES_INSTRUMENTATION=1 to collect them)
+        return instrumentation.metrics()
+
+    if PROFILE_FILE:
+        import atexit
+
+        # Sample every thread for the life of the process; stacks so far are also at /_profile
+        profiler = instrumentation.SamplingProfiler().start()
+        atexit.register(profiler.write, PROFILE_FILE)
+
+        @app.server.route("/_profile")
+        def profile_stacks():
+            return profiler.folded(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+    @app.server.route("/_query_executor")
+    def query_executor_stats():
+        # Executed vs. coalesced chart queries
+        return query_executor.stats()
+
+    @app.server.route("/_chart_payload")
+    def chart_payload_stats():
+        # Points and bytes per chart line before and after downsampling
+        with _payload_lock:
+            return dict(payload_stats)
+
+    return app
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    """Return the module's Dash app, creating it on first access."""
+    global _app, app, server
+    with _app_lock:
+        if _app is None:
+            _app = create_app()
+            # Cache as plain module attributes so later lookups skip __getattr__
+            app, server = _app, _app.server
+    return _app
+
+
+def warm_up():
+    """Load the data and import the charting libraries ahead of the first request.
+
+    Call this from a gunicorn ``post_fork`` hook (or similar) to move the one-off
+    cost out of the first user's request.
+    """
+    get_snapshot()
+    import plotly.express  # noqa: F401
+
+
+def __getattr__(name):
+    # Lazily built module attributes: the app (and its Flask server for WSGI
+    # servers) on first access, the data fields from the current snapshot
+    if name == "app":
+        return get_app()
+    if name == "server":
+        return get_app().server
+    if name == "snapshot":
+        return get_snapshot()
+    if name == "df":
+        return row_data()
+    if name == "daily_sales":
+        return get_snapshot().daily_sales
+    if name == "data_version":
+        return get_snapshot().version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def query_sales(selected_region, current, start_date=None, end_date=None, granularity="day"):
+    """One region's totals per day, week or month from a snapshot, as a Date/Sales frame.
+
+    The SQLite backend answers with an index range scan on (region, date). Daily
+    series come from the compact series store, and rollups from their cubes.
+    """
+    if current.store is not None:
+        return current.store.sales(selected_region, start_date, end_date, granularity)
+    if granularity == "day" and current.series is not None:
+        return current.series.frame(selected_region, start_date, end_date)
+    cube = current.daily_sales if granularity == "day" else current.rollups[granularity]
+    return region_daily_sales(slice_dates(cube, start_date, end_date), selected_region)
+
+
+def render_chart(selected_region, current, start_date, end_date, granularity="day", overlays=()):
+    """Build the chart for a region and date range of a snapshot; runs on the query pool."""
+    with instrumentation.span("chart.query", region=selected_region, granularity=granularity) as span:
+        full_data = query_sales(selected_region, current, start_date, end_date, granularity)
+        span.add_rows(len(full_data))
+    with instrumentation.span("chart.downsample", region=selected_region) as span:
+        data = chart_data(selected_region, full_data, current.product, granularity)
+        span.add_rows(len(data))
+
+    with instrumentation.span("chart.overlays", region=selected_region):
+        traces = []
+        if granularity == "day":
+            traces = overlay_traces(selected_region, current, full_data, start_date, end_date, overlays)
+        markers = event_markers(selected_region, current, data)
+    with instrumentation.span("chart.build", region=selected_region):
+        return build_chart(
+            selected_region, data, granularity, traces + ([markers] if markers else []), product=current.product
+        )
+
+
+def render_product_chart(selected_region, current, product, start_date, end_date, granularity="day", overlays=()):
+    """``render_chart`` for ``product``, loading its partition on first use; runs on the query pool."""
+    return render_chart(
+        selected_region, product_snapshot(current, product), start_date, end_date, granularity, overlays
+    )
+
+
+def update_chart(selected_region, start_date=None, end_date=None, granularity="day", overlays=(), product=None):
+    """Return the sales chart for a region, optional date range, granularity, overlays and product."""
+    # Hold one snapshot for the whole request, even if a reload swaps in a new one
+    current = get_snapshot()
+    product = product or current.product
+    key = (product, selected_region, start_date, end_date, granularity, tuple(sorted(overlays or ())))
+    instrumentation.count("chart.requests")
+
+    # Serve repeated requests for the same inputs and data from the cache
+    return figure_cache.get_or_build(
+        key,
+        current.version,
+        lambda: query_executor.run(
+            (current.version,) + key, render_product_chart, selected_region, current, product, start_date, end_date,
+            granularity, key[-1],
         ),
-        # Footer
-        html.Div(
+    )
+
+
+async def update_chart_async(
+    selected_region, start_date=None, end_date=None, granularity="day", overlays=(), product=None
+):
+    """Async form of ``update_chart`` that never blocks the event loop."""
+    current = _snapshot
+    if current is None:
+        # Load the data on the pool the first time; concurrent first requests share the load
+        current = await query_executor.query("snapshot", get_snapshot)
+    product = product or current.product
+    key = (product, selected_region, start_date, end_date, granularity, tuple(sorted(overlays or ())))
+    instrumentation.count("chart.requests")
+
+    figure = figure_cache.lookup(key, current.version)
+    if figure is MISSING:
+        figure = await query_executor.query(
+            (current.version,) + key, render_product_chart, selected_region, current, product, start_date, end_date,
+            granularity, key[-1],
+        )
+        figure_cache.store(key, current.version, figure)
+    return figure
+
+
+def price_impact(current):
+    """Before/after price increase statistics per region for a snapshot, cached per version."""
+    from impact import before_after_impact
+
+    def build():
+        cube = current.daily_sales if current.store is None else current.store.daily_cube()
+        return before_after_impact(cube, PRICE_INCREASE_DATE)
+
+    return impact_cache.get_or_build(("price-increase", current.product), current.version, build)
+
+
+# Rolling means per product, as (version, means) of the last snapshot they were
+# computed for, extended on reload
+_rolling = {}
+_rolling_lock = threading.Lock()
+
+
+def rolling_means(current):
+    """Rolling means of every region's daily totals for a snapshot; see ``trends.RollingMeans``.
+
+    They are computed once per data version. When a reload only appended days, the
+    previous version's means are extended with the new days instead of recomputed.
+    """
+    from trends import RollingMeans
+
+    with _rolling_lock:
+        previous = _rolling.get(current.product)
+        if previous is not None and previous[0] == current.version:
+            return previous[1]
+        cube = current.daily_sales if current.store is None else current.store.daily_cube()
+        means = previous[1].update(cube) if previous is not None else RollingMeans(cube)
+        _rolling[current.product] = (current.version, means)
+        return means
+
+
+def overlay_traces(selected_region, current, full_data, start_date=None, end_date=None, overlays=()):
+    """Line trace dicts for the selected overlays of a region's daily chart."""
+    from trends import linear_trend
+
+    traces = []
+    for overlay in OVERLAY_STYLES:
+        if overlay not in (overlays or ()):
+            continue
+        if overlay == "trend":
+            data = linear_trend(full_data)
+        else:
+            window = int(overlay.split("-")[1])
+            means = slice_dates(rolling_means(current).means[window], start_date, end_date)
+            data = downsample_daily_sales(region_daily_sales(means, selected_region))
+        if len(data):
+            traces.append(line_trace(data, **OVERLAY_STYLES[overlay]))
+    return traces
+
+
+def line_trace(data, name, color):
+    """A thin dotted line trace dict for a Date/Sales series."""
+    import numpy as np
+
+    dates = data["Date"].to_numpy(dtype="datetime64[s]")
+    return {
+        "type": "scatter",
+        "mode": "lines",
+        "name": name,
+        "showlegend": False,
+        "x": np.datetime_as_string(dates, unit="s").tolist(),
+        "y": encode_values(data["Sales"].to_numpy(dtype="float64")),
+        "line": {"color": color, "width": 2, "dash": "dot"},
+        "hovertemplate": f"<b>{name}:</b> $%{{y:,.0f}}<extra></extra>",
+    }
+
+
+def event_impacts(current):
+    """Windowed before/after statistics for every event date, cached per data version.
+
+    Returns a frame indexed by (Event, Region); see ``impact.EventWindows``.
+    """
+    from impact import EventWindows
+
+    def build():
+        cube = current.daily_sales if current.store is None else current.store.daily_cube()
+        return EventWindows(cube).impacts(EVENT_DATES, EVENT_WINDOW_DAYS)
+
+    return impact_cache.get_or_build(("events", current.product), current.version, build)
+
+
+def event_label(event_date):
+    """Name an event date on the chart."""
+    return "💰 Price Increase" if event_date == PRICE_INCREASE_DATE else "📍 Event"
+
+
+def event_markers(selected_region, current, data):
+    """Overlay trace marking each event on the charted series, or None if none are in range.
+
+    Each marker sits on the first charted point at or after its event, and its hover
+    text gives the region's mean daily sales in the windows either side of it.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not EVENT_DATES:
+        return None
+    impacts = event_impacts(current)
+    dates = data["Date"].to_numpy(dtype="datetime64[s]")
+
+    x, y, text = [], [], []
+    for event in sorted(EVENT_DATES):
+        i = int(np.searchsorted(dates, np.datetime64(event, "s")))
+        if i == 0 or i == len(dates) or (pd.Timestamp(event), selected_region) not in impacts.index:
+            continue
+        stats = impacts.loc[(pd.Timestamp(event), selected_region)]
+        x.append(str(np.datetime_as_string(dates[i], unit="s")))
+        y.append(float(data["Sales"].iloc[i]))
+        text.append(
+            f"<b>{event_label(event)}</b> {event:%b %d, %Y}<br>"
+            f"{EVENT_WINDOW_DAYS} days before: ${stats['before_mean']:,.0f}/day<br>"
+            f"{EVENT_WINDOW_DAYS} days after: ${stats['after_mean']:,.0f}/day<br>"
+            f"Change: {stats['pct_change']:+.1f}%"
+        )
+
+    if not x:
+        return None
+    return {
+        "type": "scatter",
+        "mode": "markers",
+        "name": "Events",
+        "showlegend": False,
+        "x": x,
+        "y": y,
+        "hovertext": text,
+        "hoverinfo": "text",
+        "marker": {"symbol": "diamond", "size": 12, "color": "#e74c3c", "line": {"color": "white", "width": 1}},
+    }
+
+
+def product_options():
+    """Options for the product picker."""
+    return [{"label": product.title(), "value": product} for product in available_products()]
+
+
+def update_impact_summary(selected_region, product=None):
+    """Return the impact summary table for the current data of ``product``."""
+    return build_impact_table(price_impact(product_snapshot(get_snapshot(), product)), selected_region)
+
+
+def build_impact_table(impact, selected_region):
+    """Render per-region impact statistics as a table, highlighting ``selected_region``."""
+    from dash import html
+
+    cell = {"padding": "8px 12px", "textAlign": "right", "borderBottom": "1px solid #e9ecef"}
+    headers = ["Region", "Avg before", "Avg after", "Change", "95% CI of change"]
+
+    rows = []
+    for region, stats in impact.iterrows():
+        highlight = {"backgroundColor": "#eef0fc", "fontWeight": "bold"} if region == selected_region else {}
+        rows.append(html.Tr(
             [
-                html.P(
-                    "📊 Data-driven insights for better business decisions",
-                    style={
-                        "textAlign": "center",
-                        "color": "#6c757d",
-                        "fontFamily": "Arial, sans-serif",
-                        "fontSize": "0.9rem",
-                        "fontStyle": "italic",
-                    },
-                )
+                html.Td("All Regions" if region == "all" else region.title(), style=dict(cell, textAlign="left")),
+                html.Td(f"${stats['before_mean']:,.0f}", style=cell),
+                html.Td(f"${stats['after_mean']:,.0f}", style=cell),
+                html.Td(f"{stats['pct_change']:+.1f}%", style=cell),
+                html.Td(f"${stats['ci_low']:+,.0f} to ${stats['ci_high']:+,.0f}", style=cell),
             ],
-            style={"marginTop": "30px", "padding": "20px"},
-        ),
-    ],
-    style={
-        "backgroundColor": "#f8f9fa",
-        "minHeight": "100vh",
-        "fontFamily": "Arial, sans-serif",
-    },
-)
+            style=highlight,
+        ))
+
+    return html.Table(
+        [html.Thead(html.Tr([html.Th(h, style=dict(cell, color="#2c3e50")) for h in headers])), html.Tbody(rows)],
+        style={"width": "100%", "borderCollapse": "collapse", "fontFamily": "Arial, sans-serif"},
+    )
+
+
+def payload_key(selected_region, product=PRODUCT, granularity="day"):
+    """Key of a chart line in ``payload_stats``, e.g. "pink morsel/north/day"."""
+    return f"{product}/{selected_region}/{granularity}"
+
+
+def chart_data(selected_region, full_data, product=PRODUCT, granularity="day"):
+    """The Date/Sales series charted for one region from its full per-period totals."""
+    # Downsample long histories to the point budget, keeping the visual shape
+    filtered_data = downsample_daily_sales(full_data)
+    stats = {
+        "points_before": len(full_data),
+        "points_after": len(filtered_data),
+        "bytes_before": series_payload_bytes(full_data),
+        "bytes_after": series_payload_bytes(filtered_data),
+    }
+    with _payload_lock:
+        payload_stats[payload_key(selected_region, product, granularity)] = stats
+    return filtered_data
+
+
+# Plotly express switches line charts to WebGL above this many points
+WEBGL_THRESHOLD = 1000
+
+# Trace style and layout per product, region and trace type, built once with plotly
+# express. Bounded, as the region comes from the client
+_figure_templates = FigureCache(maxsize=64)
+
+
+def figure_template(selected_region, webgl=False, granularity="day", product=PRODUCT):
+    """Return ``(trace, layout)`` dicts for a region's chart, without the data arrays.
+
+    Plotly express draws long series as "scattergl" traces, which accept slightly
+    different properties, so each trace type has its own template.
+    """
+    def build():
+        import pandas as pd
+
+        # A sample just long enough to get the same trace type plotly express would pick
+        points = WEBGL_THRESHOLD + 1 if webgl else 1
+        sample = pd.DataFrame({
+            "Date": pd.date_range(PRICE_INCREASE_DATE, periods=points, freq="D"),
+            "Sales": [0.0] * points,
+        })
+        spec = build_figure(sample, selected_region, granularity, product=product).to_plotly_json()
+        trace = {key: value for key, value in spec["data"][0].items() if key not in ("x", "y")}
+        return trace, spec["layout"]
+
+    return _figure_templates.get_or_build((product, selected_region, webgl, granularity), None, build)
 
 
-# Callback for updating the chart based on region selection
-@callback(Output("sales-line-chart", "figure"), Input("region-filter", "value"))
-def update_chart(selected_region):
-    # Filter data based on selected region
+def encode_values(values):
+    """Encode a float array for the browser the way the installed plotly does.
+
+    Plotly 6+ sends numeric arrays as base64 typed arrays, which plotly.js decodes
+    without parsing; older versions send plain JSON lists.
+    """
+    import plotly
+
+    if int(plotly.__version__.split(".")[0]) >= 6:
+        return {"dtype": "f8", "bdata": base64.b64encode(values.astype("<f8").tobytes()).decode("ascii")}
+    return values.tolist()
+
+
+def build_chart(selected_region, data, granularity="day", overlays=(), product=PRODUCT):
+    """Build the sales chart as a plain figure dict, skipping plotly object construction.
+
+    ``data`` is the (downsampled) Date/Sales series from ``chart_data``. The trace
+    style and layout come from ``figure_template``; only the x/y arrays are filled in
+    per request, with dates as ISO strings and sales through
+    ``encode_values``. ``overlays`` are extra trace dicts drawn on top, such as
+    ``event_markers``. The result serializes to the same JSON as ``build_figure``.
+    The template is copied, so editing a returned figure never changes later ones.
+    """
+    import copy
+
+    import numpy as np
+
+    trace, layout = figure_template(
+        selected_region, webgl=len(data) > WEBGL_THRESHOLD, granularity=granularity, product=product
+    )
+
+    dates = data["Date"].to_numpy(dtype="datetime64[s]")
+    return {
+        "data": [
+            dict(
+                copy.deepcopy(trace),
+                x=np.datetime_as_string(dates, unit="s").tolist(),
+                y=encode_values(data["Sales"].to_numpy(dtype="float64")),
+            )
+        ] + list(overlays),
+        "layout": copy.deepcopy(layout),
+    }
+
+
+def build_figure(filtered_data, selected_region, granularity="day", overlays=(), product=PRODUCT):
+    """Build the sales line chart for a Date/Sales series with plotly express."""
+    period = PERIOD_LABELS[granularity]
     if selected_region == "all":
-        # Group by date and sum sales across all regions
-        filtered_data = df.groupby("Date")["Sales"].sum().reset_index()
-        chart_title = "Pink Morsel Daily Sales - All Regions"
+        chart_title = f"{product.title()} {period} Sales - All Regions"
         line_color = "#667eea"
     else:
-        # Filter for specific region and group by date
-        region_data = df[df["Region"] == selected_region]
-        filtered_data = region_data.groupby("Date")["Sales"].sum().reset_index()
-        chart_title = f"Pink Morsel Daily Sales - {selected_region.title()} Region"
+        chart_title = f"{product.title()} {period} Sales - {selected_region.title()} Region"
 
         # Different colors for different regions
         color_map = {
@@ -167,8 +1424,7 @@ def update_chart(selected_region):
         }
         line_color = color_map.get(selected_region, "#667eea")
 
-    # Sort by date
-    filtered_data = filtered_data.sort_values("Date")
+    import plotly.express as px
 
     # Create the line chart
     fig = px.line(
@@ -176,7 +1432,7 @@ def update_chart(selected_region):
         x="Date",
         y="Sales",
         title=chart_title,
-        labels={"Date": "Date", "Sales": "Total Daily Sales ($)"},
+        labels={"Date": "Date", "Sales": f"Total {period} Sales ($)"},
     )
 
     # Update layout and styling
@@ -187,7 +1443,7 @@ def update_chart(selected_region):
 
     fig.update_layout(
         xaxis_title="Date",
-        yaxis_title="Total Daily Sales ($)",
+        yaxis_title=f"Total {period} Sales ($)",
         hovermode="x unified",
         plot_bgcolor="white",
         paper_bgcolor="white",
@@ -202,24 +1458,41 @@ def update_chart(selected_region):
         margin=dict(l=60, r=60, t=80, b=60),
     )
 
-    # Add vertical line for price increase
-    fig.add_vline(
-        x=datetime(2021, 1, 15),
-        line_dash="dash",
-        line_color="#e74c3c",
-        line_width=2,
-        annotation_text="💰 Price Increase<br>Jan 15, 2021",
-        annotation_position="top",
-        annotation=dict(
-            font=dict(color="#e74c3c", size=12),
-            bgcolor="rgba(231, 76, 60, 0.1)",
-            bordercolor="#e74c3c",
-            borderwidth=1,
-        ),
-    )
+    # Add a vertical line for each event, such as the price increase
+    for event_date in EVENT_DATES:
+        fig.add_vline(
+            x=event_date,
+            line_dash="dash",
+            line_color="#e74c3c",
+            line_width=2,
+            annotation_text=f"{event_label(event_date)}<br>{event_date:%b %d, %Y}",
+            annotation_position="top",
+            annotation=dict(
+                font=dict(color="#e74c3c", size=12),
+                bgcolor="rgba(231, 76, 60, 0.1)",
+                bordercolor="#e74c3c",
+                borderwidth=1,
+            ),
+        )
+
+    # Draw overlays such as rolling means and event markers on top
+    for overlay in overlays:
+        fig.add_trace(overlay)
 
     return fig
 
 
 if __name__ == "__main__":
-    app.run_server(debug=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Soul Foods sales dashboard.")
+    parser.add_argument("--build-shared-cube", metavar="PATH",
+                        help="Write the memory-mapped daily cube for worker processes and exit")
+    args = parser.parse_args()
+
+    if args.build_shared_cube:
+        build_shared_cube(cube_path=args.build_shared_cube)
+        print(f"Shared cube saved to {args.build_shared_cube}")
+    else:
+        warm_up()
+        get_app().run(debug=True)
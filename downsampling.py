@@ -0,0 +1,72 @@
+"""
+Downsampling of long line-chart series with largest-triangle-three-buckets (LTTB).
+LTTB keeps the points that contribute most to the visual shape of a line, so a
+chart drawn from a few hundred points looks like one drawn from every point.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """Return the indices of at most ``threshold`` points chosen by LTTB.
+
+    ``x`` and ``y`` are numeric arrays of equal length with ``x`` ascending. The
+    first and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Interior points are split into threshold - 2 buckets; one point is kept from each
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and that average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_indices(x, y, max_points, breakpoints=()):
+    """LTTB indices for a series that always keep the points around each breakpoint.
+
+    The series is split at every breakpoint (an ``x`` value) and each segment is
+    downsampled on its own with a share of ``max_points`` proportional to its
+    length. LTTB keeps segment endpoints, so the last point before and the first
+    point at or after each breakpoint always survive.
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    cuts = np.searchsorted(x, np.asarray(sorted(breakpoints), dtype=np.float64))
+    bounds = [0] + [int(c) for c in cuts if 0 < c < n] + [n]
+
+    indices = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end <= start:
+            continue
+        budget = max(2, int(round(max_points * (end - start) / n)))
+        indices.append(start + lttb_indices(x[start:end], y[start:end], budget))
+    return np.concatenate(indices)
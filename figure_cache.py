@@ -0,0 +1,75 @@
+"""
+Bounded LRU cache for chart figures.
+Entries are keyed by the request inputs plus the version of the data they were
+built from, so a new data version never serves a stale figure.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Returned by FigureCache.lookup on a miss, as None may be a cached value
+MISSING = object()
+
+
+class FigureCache:
+    """Thread-safe LRU cache with hit/miss counters."""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key, version):
+        """Return the cached value for ``(key, version)``, or ``MISSING``.
+
+        Seeing a new ``version`` drops every entry built from an older one.
+        """
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def store(self, key, version, value):
+        """Cache ``value`` unless a newer data version has been seen meanwhile."""
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def get_or_build(self, key, version, build):
+        """Return the cached value for ``(key, version)``, calling ``build()`` on a miss."""
+        value = self.lookup(key, version)
+        if value is MISSING:
+            # Build outside the lock so slow builds don't serialize other requests
+            value = build()
+            self.store(key, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring, e.g. served from the /_figure_cache route."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
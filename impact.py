@@ -0,0 +1,133 @@
+"""
+Before/after impact analytics for change dates, such as a price increase.
+Every region is a column of a daily Date x Region cube, so the statistics for all
+regions come out of one vectorized pass instead of a filter-and-mean per region.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+def _impact_frame(regions, before, after, confidence):
+    """Impact statistics per region from ``(count, mean, sum of squared deviations)`` on each side."""
+    (n_before, before_mean, m2_before), (n_after, after_mean, m2_after) = before, after
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_before = m2_before / (n_before - 1)
+        var_after = m2_after / (n_after - 1)
+        delta = after_mean - before_mean
+
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        margin = z * np.sqrt(var_before / n_before + var_after / n_after)
+
+        impact = pd.DataFrame(
+            {
+                "n_before": np.asarray(n_before, dtype="int64"),
+                "n_after": np.asarray(n_after, dtype="int64"),
+                "before_mean": before_mean,
+                "after_mean": after_mean,
+                "delta": delta,
+                "pct_change": delta / before_mean * 100,
+                "ci_low": delta - margin,
+                "ci_high": delta + margin,
+            },
+            index=pd.Index(regions, name="Region"),
+        )
+
+    # "all" leads, as in the dashboard's region picker
+    order = [r for r in impact.index if r == "all"] + [r for r in impact.index if r != "all"]
+    return impact.loc[order]
+
+
+def _side(days):
+    """``(count, mean, sum of squared deviations)`` per region over some rows of a cube.
+
+    Deviations are taken from the mean in a second pass rather than expanded into
+    sums of squares, which cancel catastrophically when sales are large.
+    """
+    values = days.to_numpy(dtype="float64")
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(present, values, 0.0).sum(axis=0) / count
+    deviations = np.where(present, values - mean, 0.0)
+    return count, mean, (deviations ** 2).sum(axis=0)
+
+
+def before_after_impact(cube, event_date, confidence=0.95):
+    """Compare mean daily sales before and from ``event_date`` on, for every region.
+
+    Returns a frame indexed by region ("all" first) with the day counts and means on
+    each side, the delta and percentage change of the means, and a ``confidence``
+    interval for the delta (Welch standard error, normal approximation). Days a
+    region has no sales (NaN in the cube) are left out of its statistics.
+    """
+    after = cube.index >= pd.Timestamp(event_date)
+    return _impact_frame(list(cube.columns), _side(cube[~after]), _side(cube[after]), confidence)
+
+
+class EventWindows:
+    """Prefix sums over a daily cube for constant-time window statistics.
+
+    The cube is laid out on a dense daily calendar, so a date maps to its row by
+    subtraction, and the count, sum and sum of squares over any run of days are the
+    difference of two prefix rows. Building is O(days x regions); each window
+    query is O(regions) whatever its length.
+
+    The sums are of each region's deviations from its whole-history mean, not of raw
+    sales, so they stay small as history grows and windows keep their precision.
+    """
+
+    def __init__(self, cube):
+        days = pd.date_range(cube.index.min(), cube.index.max(), freq="D")
+        values = cube.reindex(days).to_numpy(dtype="float64")
+        present = ~np.isnan(values)
+
+        self.regions = list(cube.columns)
+        self.first_day = days[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centre = np.where(present, values, 0.0).sum(axis=0) / present.sum(axis=0)
+        self.centre = np.nan_to_num(centre)
+        deviations = np.where(present, values - self.centre, 0.0)
+
+        zero = np.zeros((1, len(self.regions)))
+        self.counts = np.vstack([zero, np.cumsum(present, axis=0)])
+        self.sums = np.vstack([zero, np.cumsum(deviations, axis=0)])
+        self.squares = np.vstack([zero, np.cumsum(deviations ** 2, axis=0)])
+
+    def _row(self, date):
+        # Prefix row of ``date``: the days before it, clipped to the cube's calendar
+        offset = (pd.Timestamp(date) - self.first_day).days
+        return min(max(offset, 0), len(self.sums) - 1)
+
+    def window(self, start_date, end_date):
+        """``(count, mean, sum of squared deviations)`` per region over days in ``[start_date, end_date)``."""
+        a, b = self._row(start_date), self._row(end_date)
+        count = self.counts[b] - self.counts[a]
+        sums, squares = self.sums[b] - self.sums[a], self.squares[b] - self.squares[a]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offset = sums / count
+        # Shift the centred sums to the window's own mean
+        return count, self.centre + offset, np.maximum(squares - sums * offset, 0.0)
+
+    def event_impact(self, event_date, window_days=30, confidence=0.95):
+        """``before_after_impact`` limited to ``window_days`` either side of ``event_date``."""
+        event = pd.Timestamp(event_date)
+        span = pd.Timedelta(days=window_days)
+        return _impact_frame(
+            self.regions, self.window(event - span, event), self.window(event, event + span), confidence
+        )
+
+    def impacts(self, event_dates, window_days=30, confidence=0.95):
+        """``event_impact`` for every date, in one frame indexed by (Event, Region).
+
+        Without any dates the frame is empty, with the same columns and index levels.
+        """
+        frames = {pd.Timestamp(date): self.event_impact(date, window_days, confidence) for date in event_dates}
+        if not frames:
+            empty = self.event_impact(self.first_day, window_days, confidence).iloc[:0]
+            empty.index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), empty.index], names=["Event", "Region"])
+            return empty
+        return pd.concat(frames, names=["Event"])
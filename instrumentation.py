@@ -0,0 +1,190 @@
+"""
+Lightweight instrumentation: named timing spans, row counters and a sampling profiler.
+Spans and counters are aggregated in memory and, when enabled, each finished span
+is also logged as one JSON line. Instrumentation is off unless enabled with
+``enable()`` or the SALES_INSTRUMENTATION environment variable; while off,
+``span()`` returns a shared no-op object and ``count()`` returns immediately.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("soul_foods.metrics")
+
+_enabled = os.environ.get("SALES_INSTRUMENTATION", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}
+_counters = Counter()
+
+
+def enable(log=True):
+    """Turn instrumentation on, logging spans to stderr unless logging is already set up."""
+    global _enabled
+    _enabled = True
+    if log and not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+class Span:
+    """Times a block of code; use through ``span()``."""
+
+    __slots__ = ("name", "fields", "rows", "start")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.rows = None
+
+    def add_rows(self, rows):
+        """Record rows handled in this span; they are also added to the ``<name>.rows`` counter."""
+        self.rows = (self.rows or 0) + rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                stats = _spans[self.name] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            stats["count"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            if self.rows is not None:
+                _counters[f"{self.name}.rows"] += self.rows
+
+        record = {"span": self.name, "seconds": round(seconds, 6)}
+        if self.rows is not None:
+            record["rows"] = self.rows
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.fields)
+        logger.info(json.dumps(record, default=str))
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned by ``span()`` while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def add_rows(self, rows):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **fields):
+    """Context manager timing the block as span ``name``; ``fields`` are added to its log line."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, fields)
+
+
+def count(name, value=1):
+    """Add ``value`` to counter ``name``."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += value
+
+
+def metrics():
+    """Aggregated spans and counters, e.g. served from dash_app's /_metrics route."""
+    with _lock:
+        return {
+            "enabled": _enabled,
+            "spans": {name: dict(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters),
+        }
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class SamplingProfiler:
+    """Samples every other thread's Python stack at a fixed interval.
+
+    Stacks are kept in the folded format read by flamegraph.pl and speedscope: one
+    ``frame;frame;frame count`` line per distinct stack, outermost frame first.
+    Frames are named by function and the line it is defined on.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stacks_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                with self._stacks_lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def folded(self):
+        """The samples so far in folded-stack format."""
+        with self._stacks_lock:
+            stacks = sorted(self.stacks.items())
+        return "".join(f"{stack} {samples}\n" for stack, samples in stacks)
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
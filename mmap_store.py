@@ -0,0 +1,90 @@
+"""
+Memory-mapped array files.
+A file holds a small JSON header followed by raw, 64-byte aligned numpy arrays.
+Readers map the arrays read-only with np.memmap, so every process that maps the
+same file shares one copy of the data in the OS page cache.
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+MAGIC = b"SFARRAY1"
+ALIGNMENT = 64
+
+# Permissions of a written file, as for one opened normally. mkstemp creates files
+# only their owner can read, which would lock out workers running as another user.
+# The umask can only be read by setting it, so it is read once, at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_arrays(path, arrays, meta=None):
+    """Write ``{name: ndarray}`` and a JSON-serialisable ``meta`` dict to ``path``.
+
+    The file is written next to ``path`` and renamed into place, so readers only
+    ever map a complete file, and existing maps keep the file they opened.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Lay the arrays out after a fixed-size slot for the header
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({"meta": meta or {}, "arrays": layout}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    # A uniquely named temporary file per writer, so workers (or threads) rebuilding
+    # the same file at once never write into each other's copy
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(array.tobytes())
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_header(path):
+    """Return the ``(meta, layout, data_start)`` header of an array file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a memory-mapped array file")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    return header["meta"], header["arrays"], _align(len(MAGIC) + 8 + header_length)
+
+
+def map_arrays(path):
+    """Map every array in ``path`` read-only. Returns ``(meta, {name: np.memmap})``."""
+    meta, layout, data_start = read_header(path)
+    arrays = {}
+    for name, spec in layout.items():
+        shape = tuple(spec["shape"])
+        if 0 in shape:
+            # Zero-length arrays can't be memory-mapped
+            arrays[name] = np.empty(shape, dtype=spec["dtype"])
+            continue
+        arrays[name] = np.memmap(
+            path, mode="r", dtype=spec["dtype"], offset=data_start + spec["offset"], shape=shape
+        )
+    return meta, arrays
@@ -0,0 +1,134 @@
+"""
+Product and region partitioned copy of the formatted sales data.
+process_data.py writes every product's rows during its one scan of the raw inputs,
+laid out as ``<partition dir>/<run>/<product>/<region>.csv`` with the same Sales, Date
+and Region columns as formatted_data.csv. A reader interested in one product opens only
+that product's directory.
+
+Each ETL run writes a new run directory, then publishes it by replacing the index
+file, which also records the version of the formatted CSV written alongside it.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import pandas as pd
+
+PARTITION_DIR = "formatted_partitions"
+
+# Names the published run, its products' directories and the CSV it belongs to
+INDEX_NAME = "products.json"
+
+PARTITION_COLUMNS = ["Sales", "Date", "Region"]
+
+
+def partition_name(value):
+    """File-system safe name of a product or region, e.g. "pink morsel" -> "pink_morsel"."""
+    return re.sub(r"[^a-z0-9]+", "_", str(value).lower()).strip("_")
+
+
+def source_version(path):
+    """Version of a formatted CSV, by modification time and size (as ``dash_app.file_version``)."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class PartitionWriter:
+    """Appends formatted rows to their product/region files as the ETL scans its inputs.
+
+    Files go to a new run directory, invisible to readers until ``close()`` points
+    the index at it. Readers of the index therefore see the previous run or the new
+    one in full; the previous run is kept for readers still using it.
+    """
+
+    def __init__(self, partition_dir=PARTITION_DIR):
+        self.partition_dir = partition_dir
+        os.makedirs(partition_dir, exist_ok=True)
+        self.run_dir = tempfile.mkdtemp(prefix="run-", dir=partition_dir)
+        # product -> set of region file names written so far
+        self.written = {}
+
+    def write(self, df):
+        """Append rows with Sales, Date, Region and Product columns to their partitions."""
+        for (product, region), rows in df.groupby(["Product", "Region"], observed=True, sort=False):
+            product_dir = os.path.join(self.run_dir, partition_name(product))
+            regions = self.written.get(product)
+            if regions is None:
+                os.makedirs(product_dir, exist_ok=True)
+                regions = self.written[product] = set()
+
+            name = f"{partition_name(region)}.csv"
+            rows[PARTITION_COLUMNS].to_csv(
+                os.path.join(product_dir, name), mode="a", header=name not in regions, index=False
+            )
+            regions.add(name)
+
+    def close(self, source_file):
+        """Publish the run for the formatted CSV ``source_file``, which must already be in place.
+
+        Returns the partitioned products.
+        """
+        previous = read_index(self.partition_dir).get("run")
+        index = {
+            "run": os.path.basename(self.run_dir),
+            "source_version": source_version(source_file),
+            "products": {str(product): partition_name(product) for product in sorted(self.written)},
+        }
+        path = os.path.join(self.partition_dir, INDEX_NAME)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(f"{path}.tmp", path)
+
+        # Drop runs older than the one just replaced
+        for name in os.listdir(self.partition_dir):
+            if name.startswith("run-") and name not in (index["run"], previous):
+                shutil.rmtree(os.path.join(self.partition_dir, name), ignore_errors=True)
+        return sorted(self.written)
+
+
+def read_index(partition_dir=PARTITION_DIR, source_file=None):
+    """The published index, or ``{}`` if there is none.
+
+    With ``source_file``, an index written alongside another version of that CSV,
+    such as before an ETL run without partitioning, counts as none.
+    """
+    try:
+        with open(os.path.join(partition_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if source_file is not None:
+        try:
+            if index.get("source_version") != source_version(source_file):
+                return {}
+        except FileNotFoundError:
+            return {}
+    return index
+
+
+def partition_products(partition_dir=PARTITION_DIR, source_file=None):
+    """The products with current partitions, in name order; see ``read_index``."""
+    return sorted(read_index(partition_dir, source_file).get("products", {}))
+
+
+def read_partition(product, partition_dir=PARTITION_DIR, source_file=None):
+    """Load one product's rows from its own partition files, with a datetime Date column.
+
+    Raises KeyError for a product without current partitions; see ``read_index``.
+    """
+    index = read_index(partition_dir, source_file)
+    if not index:
+        raise KeyError(product)
+    product_dir = os.path.join(partition_dir, index["run"], index["products"][product])
+
+    frames = [
+        pd.read_csv(os.path.join(product_dir, name))
+        for name in sorted(os.listdir(product_dir))
+        if name.endswith(".csv")
+    ]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PARTITION_COLUMNS)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
@@ -1,34 +1,686 @@
+import argparse
+import collections
+import contextlib
+import csv
+import glob
+import hashlib
+import heapq
+import io
+import json
+import re
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-# Read all three CSV files
-data_files = ['data/daily_sales_data_0.csv', 'data/daily_sales_data_1.csv', 'data/daily_sales_data_2.csv']
-all_data = []
+import instrumentation
+from checksums import file_hash
+from partitions import PARTITION_DIR, PartitionWriter
+from rollups import ROLLUP_FILE, build_rollups, write_rollups
+from sales_store import SQLITE_FILE, write_sqlite
 
-for file in data_files:
-    df = pd.read_csv(file)
-    all_data.append(df)
+# Raw daily sales exports and the formatted output consumed by the dashboard
+DATA_GLOB = 'data/daily_sales_data_*.csv'
+OUTPUT_FILE = 'formatted_data.csv'
+PARQUET_FILE = 'formatted_data.parquet'
+OUTPUT_COLUMNS = {'sales': 'Sales', 'date': 'Date', 'region': 'Region'}
+DAILY_COLUMNS = list(OUTPUT_COLUMNS.values())
+PRODUCT = 'pink morsel'
 
-# Combine all dataframes
-combined_df = pd.concat(all_data, ignore_index=True)
+# Raw columns are declared up front. The low-cardinality text columns are read as
+# categoricals so each distinct string is stored (and parsed) once per file.
+RAW_DTYPES = {
+    'product': 'category',
+    'price': 'category',
+    'quantity': 'int64',
+    'date': 'category',
+    'region': 'category',
+}
 
-# Filter for Pink Morsels only
-pink_morsels = combined_df[combined_df['product'] == 'pink morsel'].copy()
+# Per-input state for incremental runs
+CACHE_DIR = '.etl_cache'
+MANIFEST_NAME = 'manifest.json'
 
-# Remove dollar sign from price and convert to float
-pink_morsels['price'] = pink_morsels['price'].str.replace('$', '', regex=False).astype(float)
+# Out-of-core aggregation: daily totals per (Date, Region), the local directory
+# partitions are spilled to, and the default memory ceiling
+DAILY_FILE = 'formatted_daily.csv'
+SPILL_DIR = '.etl_spill'
+MEMORY_LIMIT_MB = 256
+# Sub-partitions per split of a partition too large for the ceiling, and how many
+# times a partition may be split before giving up
+SPILL_FANOUT = 8
+SPILL_MAX_DEPTH = 4
 
-# Calculate sales (price * quantity)
-pink_morsels['sales'] = pink_morsels['price'] * pink_morsels['quantity']
 
-# Select only the required columns and rename to match specification
-output_df = pink_morsels[['sales', 'date', 'region']].copy()
-output_df = output_df.rename(columns={'sales': 'Sales', 'date': 'Date', 'region': 'Region'})
+def discover_data_files(pattern=DATA_GLOB):
+    """Return the raw input files matching ``pattern`` in natural numeric order."""
+    def natural_key(path):
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)]
 
-# Save to output file
-output_df.to_csv('formatted_data.csv', index=False)
+    return sorted(glob.glob(pattern), key=natural_key)
 
-print(f"Processed {len(output_df)} Pink Morsel records")
-print(f"Output saved to formatted_data.csv")
-print("\nFirst few rows of output:")
-print(output_df.head())
\ No newline at end of file
+
+DATA_FILES = discover_data_files()
+
+
+def read_raw(path_or_buffer, **kwargs):
+    """Read a raw daily sales export with the typed ``RAW_DTYPES`` columns."""
+    if 'chunksize' in kwargs:
+        return pd.read_csv(path_or_buffer, dtype=RAW_DTYPES, **kwargs)
+    with instrumentation.span('etl.read_csv') as span:
+        df = pd.read_csv(path_or_buffer, dtype=RAW_DTYPES, **kwargs)
+        span.add_rows(len(df))
+    return df
+
+
+def currency_to_cents(text):
+    """Parse a currency string such as ``'$3.00'`` into integer cents."""
+    dollars, _, fraction = text.strip().lstrip('$').replace(',', '').partition('.')
+    return int(dollars or 0) * 100 + int((fraction + '00')[:2])
+
+
+def price_cents(prices):
+    """Map a categorical price column to integer cents.
+
+    Only the distinct category strings are parsed; every row is then priced with a
+    single take over the category codes. Missing prices come back as -1.
+    """
+    lookup = np.array([currency_to_cents(value) for value in prices.cat.categories] + [-1], dtype=np.int64)
+    # Code -1 (missing) indexes the trailing sentinel
+    return lookup[prices.cat.codes.to_numpy()]
+
+
+def format_sales(df):
+    """Filter a typed raw sales frame to Pink Morsels and compute the Sales column."""
+    with instrumentation.span('etl.filter') as span:
+        output_df = _format_sales(df)
+        span.add_rows(len(output_df))
+    return output_df
+
+
+def _format_sales(df):
+    # Filter for Pink Morsels only, comparing category codes rather than strings
+    products = df['product'].cat.categories
+    if PRODUCT not in products:
+        return pd.DataFrame(columns=list(OUTPUT_COLUMNS.values()))
+    pink_morsels = df[df['product'].cat.codes.to_numpy() == products.get_loc(PRODUCT)]
+    return _sales_rows(pink_morsels)
+
+
+def _sales_rows(rows):
+    # Price in dollars from integer cents. Dividing exact cents by 100 gives the same
+    # float as parsing the dollar string, so the output matches the text path exactly.
+    cents = price_cents(rows['price'])
+    price = np.where(cents < 0, np.nan, cents / 100)
+
+    # Calculate sales (price * quantity)
+    output_df = pd.DataFrame({
+        'Sales': price * rows['quantity'].to_numpy(),
+        'Date': rows['date'].array,
+        'Region': rows['region'].array,
+    })
+    return output_df
+
+
+def format_all_sales(df):
+    """Compute the Sales column for every product's rows in one pass.
+
+    Returns the output columns plus a categorical Product column, rows in input order.
+    """
+    with instrumentation.span('etl.filter') as span:
+        output_df = _sales_rows(df)
+        output_df['Product'] = df['product'].array
+        span.add_rows(len(output_df))
+    return output_df
+
+
+def process_batch(data_files=DATA_FILES, output_file=OUTPUT_FILE):
+    """Read every input file into memory, then filter and write the output."""
+    all_data = []
+
+    for file in data_files:
+        df = read_raw(file)
+        all_data.append(format_sales(df))
+
+    # Combine the filtered frames; their categories differ per file
+    with instrumentation.span('etl.concat') as span:
+        output_df = pd.concat(all_data, ignore_index=True)
+        span.add_rows(len(output_df))
+
+    # Save to output file, swapping it into place so readers never see a partial file
+    tmp_output = f'{output_file}.tmp'
+    with instrumentation.span('etl.to_csv') as span:
+        output_df.to_csv(tmp_output, index=False)
+        span.add_rows(len(output_df))
+    os.replace(tmp_output, output_file)
+    return output_df
+
+
+def process_streaming(data_files=DATA_FILES, output_file=OUTPUT_FILE, chunksize=100_000):
+    """Filter each input file in bounded chunks, appending to the output as we go.
+
+    Peak memory depends on ``chunksize`` rather than the size of the inputs, and
+    the output is byte-identical to ``process_batch``.
+    """
+    # Start from an empty file holding just the header row
+    tmp_output = f'{output_file}.tmp'
+    pd.DataFrame(columns=list(OUTPUT_COLUMNS.values())).to_csv(tmp_output, index=False)
+
+    rows = 0
+    for file in data_files:
+        chunks = iter(read_raw(file, chunksize=chunksize))
+        while True:
+            with instrumentation.span('etl.read_csv') as span:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    span.add_rows(len(chunk))
+            if chunk is None:
+                break
+            output_df = format_sales(chunk)
+            with instrumentation.span('etl.to_csv') as span:
+                output_df.to_csv(tmp_output, mode='a', header=False, index=False)
+                span.add_rows(len(output_df))
+            rows += len(output_df)
+
+    os.replace(tmp_output, output_file)
+    return rows
+
+
+def shard_file(path, shard_bytes=None):
+    """Split ``path`` into newline-aligned ``(path, start, end)`` byte ranges.
+
+    The header row is excluded from every shard. Without ``shard_bytes`` the whole
+    file is a single shard.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        if not shard_bytes:
+            return [(path, start, size)]
+
+        shards = []
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            if f.tell() < size:
+                # Move the boundary to the end of the current line
+                f.readline()
+            end = f.tell()
+            shards.append((path, start, end))
+            start = end
+    return shards
+
+
+def process_shard(shard):
+    """Parse, filter and price one byte range of a raw input file."""
+    path, start, end = shard
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        body = f.read(end - start)
+    return format_sales(read_raw(io.BytesIO(header + body)))
+
+
+def process_parallel(data_files=DATA_FILES, output_file=OUTPUT_FILE, workers=None, shard_bytes=None):
+    """Process every input shard in a pool of worker processes.
+
+    Results are appended to the output in input order, so the file is identical
+    to the one written by ``process_batch``. At most two shards per worker are in
+    flight, so finished results never pile up in memory however many shards there are.
+    """
+    shards = [shard for file in data_files for shard in shard_file(file, shard_bytes)]
+
+    tmp_output = f'{output_file}.tmp'
+    pd.DataFrame(columns=list(OUTPUT_COLUMNS.values())).to_csv(tmp_output, index=False)
+
+    def append(future):
+        output_df = future.result()
+        with instrumentation.span('etl.to_csv') as span:
+            output_df.to_csv(tmp_output, mode='a', header=False, index=False)
+            span.add_rows(len(output_df))
+        return len(output_df)
+
+    rows = 0
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Futures are written oldest first, which keeps the output in submission order
+        pending = collections.deque()
+        for shard in shards:
+            pending.append(executor.submit(process_shard, shard))
+            if len(pending) >= window:
+                rows += append(pending.popleft())
+        while pending:
+            rows += append(pending.popleft())
+
+    os.replace(tmp_output, output_file)
+    return rows
+
+
+def process_partitioned(data_files=DATA_FILES, output_file=OUTPUT_FILE, partition_dir=PARTITION_DIR,
+                        products=None, chunksize=None):
+    """Write every product's rows partitioned by product and region, in one scan.
+
+    Each input (or chunk of ``chunksize`` rows) is read and priced once for all
+    products: its rows are appended to their ``partitions.PartitionWriter`` files, and
+    the Pink Morsel rows to ``output_file``, which is byte-identical to
+    ``process_batch``. ``products`` limits the partitions to those products; the scan
+    is the same however many are kept. Returns the partitioned products.
+    """
+    tmp_output = f'{output_file}.tmp'
+    pd.DataFrame(columns=list(OUTPUT_COLUMNS.values())).to_csv(tmp_output, index=False)
+    writer = PartitionWriter(partition_dir)
+
+    for file in data_files:
+        chunks = read_raw(file, chunksize=chunksize) if chunksize else [read_raw(file)]
+        for chunk in chunks:
+            all_sales = format_all_sales(chunk)
+            with instrumentation.span('etl.to_csv') as span:
+                keep = all_sales if products is None else all_sales[all_sales['Product'].isin(products).to_numpy()]
+                writer.write(keep)
+                pink_morsels = all_sales[(all_sales['Product'] == PRODUCT).to_numpy()]
+                pink_morsels[list(OUTPUT_COLUMNS.values())].to_csv(tmp_output, mode='a', header=False, index=False)
+                span.add_rows(len(keep))
+
+    # Publish the partitions as belonging to the output now in place. Until then
+    # readers of the new output see no current partitions, rather than stale ones
+    os.replace(tmp_output, output_file)
+    return writer.close(output_file)
+
+
+def fragment_name(path):
+    """Name of the cached output fragment for an input path."""
+    return hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16] + '.csv'
+
+
+def load_manifest(cache_dir=CACHE_DIR):
+    """Load the manifest of previously processed inputs, or an empty one."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'files': {}}
+
+
+def save_manifest(manifest, cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def process_incremental(data_files=DATA_FILES, output_file=OUTPUT_FILE, cache_dir=CACHE_DIR, chunksize=None):
+    """Reprocess only new or changed inputs and splice the output together.
+
+    Each input's formatted rows are kept as a fragment in ``cache_dir``, next to a
+    manifest recording the input's size, mtime and content hash. Unchanged inputs
+    reuse their fragment, so the output is rebuilt by concatenating fragments in
+    input order. With ``chunksize``, changed inputs are streamed into their fragments
+    that many rows at a time. Returns the list of inputs that were reprocessed.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+    previous = manifest['files']
+    current = {}
+    reprocessed = []
+
+    for file in data_files:
+        stat = os.stat(file)
+        entry = previous.get(file)
+        fragment = os.path.join(cache_dir, fragment_name(file))
+
+        # Size and mtime are a cheap first check; the hash catches touched-but-unchanged files
+        unchanged = (
+            entry is not None
+            and os.path.exists(fragment)
+            and entry['size'] == stat.st_size
+            and (entry['mtime_ns'] == stat.st_mtime_ns or entry['sha256'] == file_hash(file))
+        )
+
+        if unchanged:
+            current[file] = dict(entry, mtime_ns=stat.st_mtime_ns)
+            continue
+
+        chunks = read_raw(file, chunksize=chunksize) if chunksize else [read_raw(file)]
+        open(fragment, 'w').close()
+        for chunk in chunks:
+            format_sales(chunk).to_csv(fragment, mode='a', header=False, index=False)
+        current[file] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_hash(file),
+        }
+        reprocessed.append(file)
+
+    # Drop fragments of inputs that no longer exist
+    for file in set(previous) - set(current):
+        stale = os.path.join(cache_dir, fragment_name(file))
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    # Splice the header and every fragment into the output, then swap it into place
+    tmp_output = f'{output_file}.tmp'
+    pd.DataFrame(columns=list(OUTPUT_COLUMNS.values())).to_csv(tmp_output, index=False)
+    with open(tmp_output, 'ab') as out:
+        for file in data_files:
+            with open(os.path.join(cache_dir, fragment_name(file)), 'rb') as fragment:
+                shutil.copyfileobj(fragment, out)
+    os.replace(tmp_output, output_file)
+
+    manifest['files'] = current
+    save_manifest(manifest, cache_dir)
+    return reprocessed
+
+
+def write_parquet(output_file=OUTPUT_FILE, parquet_file=PARQUET_FILE, chunksize=1_000_000):
+    """Write a typed columnar copy of the formatted output.
+
+    Date is stored as a date32 column, Region as a dictionary column and Sales as
+    float64, so loaders skip both text parsing and ``pd.to_datetime``. The CSV is
+    converted in chunks to keep memory bounded. Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('Sales', pa.float64()),
+        ('Date', pa.date32()),
+        ('Region', pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+    tmp_file = f'{parquet_file}.tmp'
+    with pq.ParquetWriter(tmp_file, schema) as writer:
+        for chunk in pd.read_csv(output_file, chunksize=chunksize):
+            chunk['Date'] = pd.to_datetime(chunk['Date']).dt.date
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    os.replace(tmp_file, parquet_file)
+
+
+def memory_bytes(data):
+    """Deep in-memory size of a frame or series, index included."""
+    return int(np.sum(data.memory_usage(deep=True, index=True)))
+
+
+def check_memory(data, memory_limit, what):
+    """Raise MemoryError if ``data`` takes more than ``memory_limit`` bytes."""
+    size = memory_bytes(data)
+    if size > memory_limit:
+        raise MemoryError(f'{what} takes {size} bytes, over the {memory_limit}-byte memory limit')
+
+
+def spill_partitions(df, partitions, depth=0):
+    """Partition number of each row, from a hash of its (Date, Region).
+
+    Every split level hashes with its own key, so a partition split again spreads
+    its rows over new sub-partitions instead of landing in just one of them.
+    """
+    keys = df[['Date', 'Region']].astype(str)
+    hashes = pd.util.hash_pandas_object(keys, index=False, hash_key=f'spill{depth:011d}')
+    return (hashes.to_numpy() % partitions).astype(np.intp)
+
+
+def spill(df, paths, depth=0):
+    """Append the rows of a Sales/Date/Region frame to their headerless spill files."""
+    partition = spill_partitions(df, len(paths), depth)
+    for i in np.unique(partition):
+        df[partition == i].to_csv(paths[i], mode='a', header=False, index=False)
+
+
+def chunk_rows(data_files, memory_limit, sample_rows=1000):
+    """Rows per raw chunk that fit ``memory_limit`` with room for the formatted copy."""
+    sample = read_raw(data_files[0], nrows=sample_rows)
+    row_bytes = memory_bytes(sample) / max(len(sample), 1)
+    return max(1, int(memory_limit / (2 * row_bytes)))
+
+
+def aggregate_spill(path, memory_limit, chunksize, depth=0):
+    """Sum one spill file by (Date, Region) into sorted run files, returning their paths.
+
+    The file is read in chunks and folded into running totals. If the totals outgrow
+    half the memory limit, the file is split by a new hash into ``SPILL_FANOUT``
+    sub-partitions, which are aggregated the same way.
+    """
+    totals = None
+    for chunk in pd.read_csv(path, names=DAILY_COLUMNS, chunksize=chunksize):
+        partial = chunk.groupby(['Date', 'Region'])['Sales'].sum()
+        totals = partial if totals is None else pd.concat([totals, partial]).groupby(level=[0, 1]).sum()
+        if memory_bytes(totals) * 2 > memory_limit:
+            break
+    else:
+        run = f'{path}.run'
+        if totals is not None:
+            totals.sort_index().reset_index()[DAILY_COLUMNS].to_csv(run, header=False, index=False)
+        os.remove(path)
+        return [run] if totals is not None else []
+
+    # Too many distinct days and regions to total in memory: split and recurse
+    if depth >= SPILL_MAX_DEPTH:
+        raise MemoryError(f'{path} still has too many (Date, Region) keys after {depth} splits')
+    del totals
+    parts = [f'{path}.{i}' for i in range(SPILL_FANOUT)]
+    for chunk in pd.read_csv(path, names=DAILY_COLUMNS, chunksize=chunksize):
+        spill(chunk, parts, depth + 1)
+    os.remove(path)
+    return [
+        run for part in parts if os.path.exists(part)
+        for run in aggregate_spill(part, memory_limit, chunksize, depth + 1)
+    ]
+
+
+def merge_runs(runs, output_file):
+    """Merge sorted run files into one CSV ordered by (Date, Region), a row at a time.
+
+    Partitions hold disjoint keys, so merging only interleaves rows; memory holds one
+    row per run. Returns the number of rows written.
+    """
+    rows = 0
+    tmp_output = f'{output_file}.tmp'
+    with contextlib.ExitStack() as stack:
+        readers = [csv.reader(stack.enter_context(open(run, newline=''))) for run in runs]
+        with open(tmp_output, 'w', newline='') as out:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow(DAILY_COLUMNS)
+            for row in heapq.merge(*readers, key=lambda row: (row[1], row[2])):
+                writer.writerow(row)
+                rows += 1
+    os.replace(tmp_output, output_file)
+    return rows
+
+
+def aggregate_out_of_core(data_files=DATA_FILES, daily_file=DAILY_FILE, memory_limit=MEMORY_LIMIT_MB * 1024 * 1024,
+                          spill_dir=SPILL_DIR, partitions=None, output_file=None):
+    """Total Pink Morsel sales per (Date, Region) from the raw inputs within ``memory_limit`` bytes.
+
+    Raw chunks sized to the limit are formatted, pre-summed and hash-partitioned by
+    (Date, Region) into spill files under ``spill_dir``. Each partition is then
+    totalled on its own (split further if its totals do not fit), and the sorted
+    partition totals are merged into ``daily_file``. With ``output_file``, the
+    formatted chunks are also appended there in the same scan, as by
+    ``process_streaming``. Any chunk over the limit raises MemoryError. Returns the
+    number of (Date, Region) rows written.
+    """
+    os.makedirs(spill_dir, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix='aggregate-', dir=spill_dir)
+    tmp_output = f'{output_file}.tmp' if output_file else None
+    try:
+        chunksize = chunk_rows(data_files, memory_limit)
+        if tmp_output:
+            pd.DataFrame(columns=DAILY_COLUMNS).to_csv(tmp_output, index=False)
+        if partitions is None:
+            # Enough partitions for each one's share of the input to fit the limit
+            input_bytes = sum(os.path.getsize(file) for file in data_files)
+            partitions = max(2, -(-input_bytes // memory_limit))
+        paths = [os.path.join(directory, f'part-{i:05d}.csv') for i in range(partitions)]
+
+        for file in data_files:
+            for chunk in read_raw(file, chunksize=chunksize):
+                check_memory(chunk, memory_limit, f'A {chunksize}-row chunk of {file}')
+                output_df = format_sales(chunk)
+                if tmp_output:
+                    output_df.to_csv(tmp_output, mode='a', header=False, index=False)
+                totals = output_df.groupby(['Date', 'Region'], observed=True)['Sales'].sum()
+                spill(totals.reset_index()[DAILY_COLUMNS], paths)
+
+        runs = [run for path in paths if os.path.exists(path) for run in aggregate_spill(path, memory_limit, chunksize)]
+        rows = merge_runs(runs, daily_file)
+        if tmp_output:
+            os.replace(tmp_output, output_file)
+        return rows
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        if tmp_output and os.path.exists(tmp_output):
+            os.remove(tmp_output)
+
+
+def compute_rollups(output_file=OUTPUT_FILE, rollup_file=ROLLUP_FILE, chunksize=1_000_000):
+    """Write weekly and monthly rollups per region (and "all") of the formatted output.
+
+    Daily totals are summed chunk by chunk, so only one chunk plus a row per date and
+    region is held in memory. Returns the rollups as ``{granularity: cube}``.
+    """
+    partials = []
+    for chunk in pd.read_csv(output_file, chunksize=chunksize):
+        # Count every row once under its region and once under "all"
+        both = pd.concat([chunk, chunk.assign(Region='all')])
+        partials.append(both.groupby(['Date', 'Region'])['Sales'].sum())
+
+    daily = pd.concat(partials).groupby(level=['Date', 'Region']).sum().unstack('Region')
+    daily.index = pd.to_datetime(daily.index)
+    daily = daily[sorted(c for c in daily.columns if c != 'all') + ['all']]
+
+    rollups = build_rollups(daily)
+    write_rollups(rollups, rollup_file)
+    return rollups
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Format the raw daily sales data for the dashboard.')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Stream each input file in chunks of this many rows instead of loading it whole')
+    # Each of these selects a different way of building the output, so only one may be given
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument('--workers', type=int, default=None,
+                       help='Parse input files in a pool of this many worker processes')
+    parser.add_argument('--shard-mb', type=float, default=None,
+                        help='With --workers, split input files into byte-range shards of about this many MB')
+    modes.add_argument('--incremental', action='store_true',
+                       help=f'Only reprocess inputs that changed since the last run (state kept in {CACHE_DIR}/)')
+    modes.add_argument('--partitioned', action='store_true',
+                       help=f'Also write every product\'s rows to {PARTITION_DIR}/<run>/<product>/<region>.csv, '
+                            'in the same single scan of the inputs')
+    parser.add_argument('--products', nargs='+', default=None, metavar='PRODUCT',
+                        help='With --partitioned, only partition these products')
+    modes.add_argument('--out-of-core', action='store_true',
+                       help=f'Total daily sales per region from the raw inputs by spilling hash partitions to '
+                            f'disk, into {DAILY_FILE}, and build the rollups from those totals; '
+                            f'{OUTPUT_FILE} is written in the same bounded scan')
+    parser.add_argument('--memory-limit-mb', type=float, default=MEMORY_LIMIT_MB,
+                        help='With --out-of-core, the memory ceiling for chunks and partition totals')
+    parser.add_argument('--spill-dir', default=SPILL_DIR,
+                        help='With --out-of-core, the local directory for spill files')
+    parser.add_argument('--parquet', action='store_true',
+                        help=f'Also write a typed columnar copy to {PARQUET_FILE} (requires pyarrow)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help=f'Also write an indexed SQLite store to {SQLITE_FILE}')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Log a JSON line per timed stage and print stage totals at the end')
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='Sample the run with a profiler and write folded stacks (for flamegraphs) to PATH')
+    args = parser.parse_args(argv)
+    if args.shard_mb and not args.workers:
+        parser.error('--shard-mb requires --workers')
+    if args.chunksize and args.workers:
+        parser.error('--chunksize cannot be used with --workers, which parses whole shards')
+    if args.products and not args.partitioned:
+        parser.error('--products requires --partitioned')
+    if args.chunksize and args.out_of_core:
+        parser.error('--chunksize cannot be used with --out-of-core, which sizes chunks by --memory-limit-mb')
+    return args
+
+
+def run_etl(args):
+    """Build formatted_data.csv using the mode selected on the command line."""
+    if args.incremental:
+        reprocessed = process_incremental(chunksize=args.chunksize)
+        print(f"Reprocessed {len(reprocessed)} of {len(DATA_FILES)} input files")
+        for file in reprocessed:
+            print(f"  {file}")
+        print(f"Output saved to {OUTPUT_FILE}")
+        return
+
+    if args.out_of_core:
+        # One scan within the ceiling writes the formatted output and the daily totals
+        rows = aggregate_out_of_core(daily_file=DAILY_FILE, memory_limit=int(args.memory_limit_mb * 1024 * 1024),
+                                     spill_dir=args.spill_dir, output_file=OUTPUT_FILE)
+        print(f"Daily totals for {rows} days and regions saved to {DAILY_FILE}")
+        print(f"Output saved to {OUTPUT_FILE}")
+        return
+
+    if args.partitioned:
+        products = process_partitioned(products=args.products, chunksize=args.chunksize)
+        print(f"Partitioned {len(products)} products by region into {PARTITION_DIR}/")
+        print(f"Output saved to {OUTPUT_FILE}")
+        return
+
+    if args.workers:
+        shard_bytes = int(args.shard_mb * 1024 * 1024) if args.shard_mb else None
+        rows = process_parallel(workers=args.workers, shard_bytes=shard_bytes)
+        print(f"Processed {rows} Pink Morsel records (workers={args.workers})")
+        print(f"Output saved to {OUTPUT_FILE}")
+        return
+
+    if args.chunksize:
+        rows = process_streaming(chunksize=args.chunksize)
+        print(f"Processed {rows} Pink Morsel records (streaming, chunksize={args.chunksize})")
+        print(f"Output saved to {OUTPUT_FILE}")
+        return
+
+    output_df = process_batch()
+
+    print(f"Processed {len(output_df)} Pink Morsel records")
+    print(f"Output saved to {OUTPUT_FILE}")
+    print("\nFirst few rows of output:")
+    print(output_df.head())
+
+
+def run_outputs(args):
+    """Build formatted_data.csv and every derived output requested on the command line."""
+    with instrumentation.span('etl.run'):
+        run_etl(args)
+
+    with instrumentation.span('etl.rollups'):
+        # The daily totals have the output's columns, so they roll up the same way
+        compute_rollups(DAILY_FILE if args.out_of_core else OUTPUT_FILE, ROLLUP_FILE)
+    print(f"Weekly and monthly rollups saved to {ROLLUP_FILE}")
+
+    if args.parquet:
+        with instrumentation.span('etl.parquet'):
+            write_parquet()
+        print(f"Columnar copy saved to {PARQUET_FILE}")
+
+    if args.sqlite:
+        with instrumentation.span('etl.sqlite'):
+            write_sqlite(OUTPUT_FILE, SQLITE_FILE)
+        print(f"SQLite store saved to {SQLITE_FILE}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        instrumentation.enable()
+
+    if args.profile:
+        with instrumentation.SamplingProfiler() as profiler:
+            run_outputs(args)
+        profiler.write(args.profile)
+        print(f"Profile stacks saved to {args.profile}")
+    else:
+        run_outputs(args)
+
+    if args.metrics:
+        print(json.dumps(instrumentation.metrics(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Thread-pool query executor with in-flight request coalescing.
+Slow data queries run on a shared pool instead of the request thread, and
+concurrent requests for the same key share one computation.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueryExecutor:
+    """Run keyed queries on a thread pool, coalescing duplicate in-flight keys."""
+
+    def __init__(self, max_workers=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sales-query")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def submit(self, key, func, *args):
+        """Return a ``concurrent.futures.Future`` for ``func(*args)``.
+
+        While a query for ``key`` is still running, later calls with the same key
+        get its future instead of starting another computation.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._pool.submit(func, *args)
+            self._in_flight[key] = future
+            self.executed += 1
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def query(self, key, func, *args):
+        """Await ``func(*args)`` from any event loop without blocking it."""
+        # Imported here to keep asyncio out of dash_app's startup imports
+        import asyncio
+
+        return await asyncio.wrap_future(self.submit(key, func, *args))
+
+    def run(self, key, func, *args):
+        """Blocking form of ``query`` for synchronous callers."""
+        return self.submit(key, func, *args).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,62 @@
+"""
+Weekly and monthly rollups of the daily sales totals.
+A rollup is a Date x Region table like the daily cube, with one row per period
+labelled by the period's first day, and an "all" column for every region together.
+Rollups are summed from daily totals, never from raw rows.
+"""
+
+import os
+
+import pandas as pd
+
+ROLLUP_FILE = "formatted_rollups.csv"
+
+# Resampling rule per granularity; periods are labelled by their first day
+ROLLUP_RULES = {
+    "week": {"rule": "W-MON", "closed": "left", "label": "left"},
+    "month": {"rule": "MS"},
+}
+
+GRANULARITIES = ("day",) + tuple(ROLLUP_RULES)
+
+
+def rollup(cube, granularity):
+    """Sum a daily Date x Region cube into weekly or monthly periods.
+
+    Periods where a region has no daily totals stay NaN, as in the daily cube.
+    """
+    spec = dict(ROLLUP_RULES[granularity])
+    rule = spec.pop("rule")
+    return cube.resample(rule, **spec).sum(min_count=1)
+
+
+def build_rollups(cube):
+    """Every rollup of a daily cube, as ``{granularity: cube}``."""
+    return {granularity: rollup(cube, granularity) for granularity in ROLLUP_RULES}
+
+
+def write_rollups(rollups, path=ROLLUP_FILE):
+    """Write rollups to one long CSV of Granularity, Date, Region and Sales columns."""
+    frames = []
+    for granularity, cube in rollups.items():
+        long = cube.rename_axis(index="Date", columns="Region").stack().rename("Sales").reset_index()
+        long.insert(0, "Granularity", granularity)
+        frames.append(long)
+
+    tmp_path = f"{path}.tmp"
+    pd.concat(frames, ignore_index=True).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def read_rollups(path=ROLLUP_FILE):
+    """Read rollups written by ``write_rollups`` back into ``{granularity: cube}``."""
+    long = pd.read_csv(path, parse_dates=["Date"])
+    rollups = {}
+    for granularity, rows in long.groupby("Granularity", sort=False):
+        cube = rows.pivot(index="Date", columns="Region", values="Sales").sort_index()
+        # Regions in sorted order with "all" last, matching the daily cube
+        regions = sorted(c for c in cube.columns if c != "all") + ["all"]
+        cube = cube.reindex(columns=regions)
+        cube.columns.name = "Region"
+        rollups[granularity] = cube
+    return rollups
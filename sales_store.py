@@ -0,0 +1,157 @@
+"""
+Embedded SQLite store for the formatted sales data.
+Rows are kept in a `sales` table indexed on (region, date), next to a
+`daily_sales` table of per-region daily totals (including "all") keyed the same
+way, and a `rollups` table of weekly and monthly totals. Queries for one region and date range are index range scans, so they cost
+O(log n + k) however long the history grows.
+"""
+
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from rollups import build_rollups
+
+SQLITE_FILE = "formatted_data.db"
+
+SCHEMA = """
+CREATE TABLE sales (
+    region TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sales REAL NOT NULL
+);
+CREATE TABLE daily_sales (
+    region TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sales REAL NOT NULL,
+    PRIMARY KEY (region, date)
+) WITHOUT ROWID;
+CREATE TABLE rollups (
+    granularity TEXT NOT NULL,
+    region TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sales REAL NOT NULL,
+    PRIMARY KEY (granularity, region, date)
+) WITHOUT ROWID;
+"""
+
+
+def write_sqlite(csv_file, db_file=SQLITE_FILE, chunksize=1_000_000):
+    """Build the SQLite store from a formatted CSV, streaming it in chunks.
+
+    The database is built next to ``db_file`` and renamed into place, so readers
+    never open a half-built store.
+    """
+    tmp_file = f"{db_file}.tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.executescript(SCHEMA)
+        for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+            conn.executemany(
+                "INSERT INTO sales (region, date, sales) VALUES (?, ?, ?)",
+                zip(chunk["Region"].astype(str), chunk["Date"].astype(str), chunk["Sales"].astype(float)),
+            )
+
+        # Index after loading, which is much faster than maintaining it per insert
+        conn.execute("CREATE INDEX sales_region_date ON sales (region, date)")
+        conn.execute(
+            "INSERT INTO daily_sales SELECT region, date, SUM(sales) FROM sales GROUP BY region, date"
+        )
+        conn.execute(
+            "INSERT INTO daily_sales SELECT 'all', date, SUM(sales) FROM sales GROUP BY date"
+        )
+
+        # Rollups are summed from the daily totals, which fit in memory
+        daily = pd.read_sql_query("SELECT region, date, sales FROM daily_sales", conn, parse_dates=["date"])
+        daily = daily.pivot(index="date", columns="region", values="sales")
+        for granularity, cube in build_rollups(daily).items():
+            long = cube.stack()
+            conn.executemany(
+                "INSERT INTO rollups (granularity, region, date, sales) VALUES (?, ?, ?, ?)",
+                (
+                    (granularity, region, date.strftime("%Y-%m-%d"), float(sales))
+                    for (date, region), sales in long.items()
+                ),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_file, db_file)
+
+
+class SqliteSalesStore:
+    """Read-only queries against a store written by ``write_sqlite``."""
+
+    def __init__(self, db_file=SQLITE_FILE):
+        if not os.path.exists(db_file):
+            raise FileNotFoundError(db_file)
+        self.db_file = db_file
+        # sqlite3 connections can't be shared across threads, so keep one per thread
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = f"file:{os.path.abspath(self.db_file)}?mode=ro"
+            conn = self._local.conn = sqlite3.connect(uri, uri=True)
+        return conn
+
+    def regions(self):
+        """Regions present in the store, excluding the "all" total."""
+        rows = self._connection().execute(
+            "SELECT DISTINCT region FROM daily_sales WHERE region != 'all' ORDER BY region"
+        )
+        return [region for (region,) in rows]
+
+    def daily_cube(self):
+        """Every region's daily totals as a Date x Region table with an "all" column."""
+        daily = pd.read_sql_query(
+            "SELECT region, date, sales FROM daily_sales", self._connection(), parse_dates=["date"]
+        )
+        cube = daily.pivot(index="date", columns="region", values="sales").rename_axis(
+            index="Date", columns="Region"
+        )
+        return cube[sorted(c for c in cube.columns if c != "all") + ["all"]]
+
+    def daily_sales(self, region, start_date=None, end_date=None):
+        """Daily totals for ``region`` ("all" for every region) as a Date/Sales frame.
+
+        Both date bounds are inclusive and optional.
+        """
+        return self.sales(region, start_date, end_date)
+
+    def sales(self, region, start_date=None, end_date=None, granularity="day"):
+        """Totals for ``region`` per day, week or month as a Date/Sales frame.
+
+        Weeks and months are dated by their first day, which must fall within the bounds.
+        """
+        bounds = (_date_key(start_date, "0000-00-00"), _date_key(end_date, "9999-99-99"))
+        if granularity == "day":
+            rows = self._connection().execute(
+                "SELECT date, sales FROM daily_sales WHERE region = ? AND date >= ? AND date <= ? ORDER BY date",
+                (region,) + bounds,
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT date, sales FROM rollups"
+                " WHERE granularity = ? AND region = ? AND date >= ? AND date <= ? ORDER BY date",
+                (granularity, region) + bounds,
+            ).fetchall()
+
+        return pd.DataFrame({
+            "Date": pd.to_datetime([date for date, _ in rows]),
+            "Sales": pd.Series([sales for _, sales in rows], dtype="float64"),
+        })
+
+
+def _date_key(value, default):
+    """Format a date bound like the stored ISO dates, or ``default`` when missing."""
+    if not value:
+        return default
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
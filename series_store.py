@@ -0,0 +1,90 @@
+"""
+Compact array-backed store of per-region daily sales series.
+One sorted date array, one float64 matrix of dates x regions and a small region
+dictionary replace the long-format frame, whose Region strings repeat on every row.
+The "all" series is precomputed: the cube's own "all" column, or a row-sum of the
+regions stored as the matrix's last column.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class SeriesStore:
+    """Daily totals per region as ``dates`` (datetime64[ns]) and a ``values`` matrix.
+
+    ``values[i, regions[name]]`` is the total for region ``name`` on ``dates[i]``,
+    NaN on dates the region has no sales.
+    """
+
+    def __init__(self, dates, values, regions):
+        self.dates = np.ascontiguousarray(dates, dtype="datetime64[ns]")
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.regions = dict(regions)
+
+    @classmethod
+    def _with_all(cls, dates, values, names):
+        # "all" is the row-sum of the regions, NaN only where every region is
+        present = ~np.isnan(values)
+        total = np.where(present.any(axis=1), np.nansum(values, axis=1), np.nan)
+        regions = {name: i for i, name in enumerate(names)}
+        regions["all"] = len(names)
+        return cls(dates, np.column_stack([values, total]), regions)
+
+    @classmethod
+    def from_cube(cls, cube):
+        """Build from a date-sorted Date x Region cube.
+
+        A cube with an "all" column is wrapped as it is: a float64 cube, such as one
+        mapped from a file, lends its matrix without a copy. Otherwise "all" is added
+        as the row-sum of the regions.
+        """
+        dates = cube.index.to_numpy(dtype="datetime64[ns]")
+        if "all" in cube.columns:
+            regions = {str(c): i for i, c in enumerate(cube.columns)}
+            return cls(dates, cube.to_numpy(dtype=np.float64, copy=False), regions)
+        names = [str(c) for c in cube.columns]
+        return cls._with_all(dates, cube.to_numpy(dtype=np.float64), names)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from long-format Sales/Date/Region rows in one vectorized pass."""
+        date_codes, dates = pd.factorize(pd.to_datetime(df["Date"]), sort=True)
+        region_codes, names = pd.factorize(df["Region"].astype(str), sort=True)
+
+        # Sum every (date, region) cell with one bincount over the flattened index
+        cells = date_codes * len(names) + region_codes
+        size = len(dates) * len(names)
+        sums = np.bincount(cells, weights=df["Sales"].to_numpy(dtype=np.float64), minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        values = np.where(counts > 0, sums, np.nan).reshape(len(dates), len(names))
+
+        return cls._with_all(np.asarray(dates, dtype="datetime64[ns]"), values, list(names))
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.values.nbytes
+
+    def bounds(self, start_date=None, end_date=None):
+        """Row range ``[start, end)`` of dates from ``start_date`` to ``end_date`` inclusive."""
+        start = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date), "ns")) if start_date else 0
+        end = (
+            np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date), "ns"), side="right")
+            if end_date else len(self.dates)
+        )
+        return int(start), int(end)
+
+    def series(self, region, start_date=None, end_date=None):
+        """``(dates, values)`` arrays of a region's daily totals, skipping dates without sales."""
+        column = self.regions.get(region)
+        if column is None:
+            return self.dates[:0], self.values[:0, 0]
+        start, end = self.bounds(start_date, end_date)
+        values = self.values[start:end, column]
+        present = ~np.isnan(values)
+        return self.dates[start:end][present], values[present]
+
+    def frame(self, region, start_date=None, end_date=None):
+        """``series`` as a Date/Sales frame."""
+        dates, values = self.series(region, start_date, end_date)
+        return pd.DataFrame({"Date": dates, "Sales": values})
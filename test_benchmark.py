@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import compare_results, report_regressions
+
+
+def suite_result(rows_per_sec, p99_ms):
+    """A one-scale suite result with the given ETL throughput and north p99 latency."""
+    return {'results': [{
+        'scale': 10,
+        'input_rows': 1000,
+        'etl_rows_per_sec': rows_per_sec,
+        'etl_peak_rss_mb': 100.0,
+        'coldstart_seconds': 1.0,
+        'coldstart_peak_rss_mb': 150.0,
+        'latency_ms': {'north': {'p50': 5.0, 'p99': p99_ms}},
+    }]}
+
+
+class TestBenchmark:
+    """Test suite for the benchmark regression check."""
+
+    def test_compare_flags_only_regressions(self):
+        """Slower or larger metrics past the threshold should fail; improvements should not."""
+        baseline = suite_result(rows_per_sec=1_000_000, p99_ms=10.0)
+
+        assert compare_results(suite_result(1_200_000, 8.0), baseline, threshold=0.2) == []
+        assert compare_results(suite_result(900_000, 11.0), baseline, threshold=0.2) == []
+
+        regressions = compare_results(suite_result(500_000, 20.0), baseline, threshold=0.2)
+        assert [(scale, metric) for scale, metric, *_ in regressions] == [
+            (10, 'etl_rows_per_sec'), (10, 'latency_p99_ms[north]'),
+        ]
+        assert regressions[0][4] == 0.5, "Throughput halving is a 50% regression"
+        assert report_regressions(regressions, 0.2) == 1
+        print("✅ Regression check test passed: only metrics worse than the threshold fail")
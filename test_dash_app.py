@@ -1,5 +1,7 @@
 import pytest
+import shutil
 import sys
+import time
 import os
 import pandas as pd
 import re
@@ -24,6 +26,10 @@ except ImportError as e:
         dash_app_source = None
 
 
+# Startup budget for `import dash_app`, in microseconds of cumulative import time
+IMPORT_BUDGET_US = 250_000
+
+
 class TestDashApp:
     """Test suite for the Soul Foods Pink Morsel Sales Analysis Dash app."""
 
@@ -258,6 +264,551 @@ class TestDashApp:
         else:
             pytest.fail("Could not analyze app configuration")
 
+    def test_load_data_prefers_parquet(self, tmp_path):
+        """Test that the loader reads the columnar copy when it is present and fresh."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        pytest.importorskip("pyarrow")
+        import process_data
+
+        parquet_file = tmp_path / "formatted_data.parquet"
+        process_data.write_parquet("formatted_data.csv", parquet_file)
+
+        from_csv = dash_app.load_data(parquet_path=None)
+        from_parquet = dash_app.load_data(parquet_path=str(parquet_file))
+
+        assert isinstance(from_parquet["Region"].dtype, pd.CategoricalDtype), "Parquet Region should be categorical"
+        assert from_parquet["Sales"].tolist() == from_csv["Sales"].tolist()
+        assert from_parquet["Region"].astype(str).tolist() == from_csv["Region"].tolist()
+        assert (from_parquet["Date"].values == from_csv["Date"].values).all()
+        print("✅ Loader test passed: parquet and CSV loads agree")
+
+    def test_daily_cube_matches_groupby(self):
+        """Test that slicing the precomputed cube equals the per-request groupby."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        # Two rows for north on the same date exercise the per-region summing
+        extra = pd.DataFrame({
+            "Sales": [0.1, 0.2],
+            "Date": pd.to_datetime(["2018-02-06", "2018-02-06"]),
+            "Region": ["north", "north"],
+        })
+        df = pd.concat([dash_app.df.astype({"Region": str}), extra], ignore_index=True)
+        cube = dash_app.build_daily_cube(df)
+
+        for region in ["all", "north", "south", "east", "west"]:
+            if region == "all":
+                expected = df.groupby("Date")["Sales"].sum().reset_index()
+            else:
+                expected = df[df["Region"] == region].groupby("Date")["Sales"].sum().reset_index()
+            expected = expected.sort_values("Date")
+
+            pd.testing.assert_frame_equal(dash_app.region_daily_sales(cube, region), expected)
+
+        assert len(dash_app.region_daily_sales(cube, "nowhere")) == 0, "Unknown regions should be empty"
+        print("✅ Cube test passed: sliced daily totals equal the groupby output")
+
+    def test_refresh_data_swaps_snapshot(self, tmp_path, monkeypatch):
+        """Test that a changed data file is swapped in while held snapshots stay intact."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        monkeypatch.setattr(dash_app, "KEEP_ROW_DATA", True)
+
+        original = dash_app.snapshot
+        data_file = tmp_path / "formatted_data.csv"
+        data_file.write_text("Sales,Date,Region\n10.0,2021-01-14,north\n20.0,2021-01-15,north\n")
+
+        try:
+            assert dash_app.refresh_data(str(data_file), parquet_path=None), "A new file should be loaded"
+            assert not dash_app.refresh_data(str(data_file), parquet_path=None), "An unchanged file should not reload"
+
+            held = dash_app.snapshot
+            assert held.daily_sales["north"].tolist() == [10.0, 20.0]
+
+            data_file.write_text("Sales,Date,Region\n30.0,2021-01-16,south\n")
+            os.utime(data_file, ns=(0, 0))
+            assert dash_app.refresh_data(str(data_file), parquet_path=None), "A changed file should reload"
+
+            assert dash_app.snapshot.daily_sales["south"].tolist() == [30.0]
+            assert held.daily_sales["north"].tolist() == [10.0, 20.0], "Held snapshots must not change"
+            assert dash_app.df is dash_app.snapshot.df
+        finally:
+            dash_app.install_snapshot(original)
+
+        print("✅ Reload test passed: new data is swapped in atomically")
+
+    def test_requests_do_not_wait_for_a_reload(self, monkeypatch):
+        """Test that the per-request watcher check does not wait while a reload holds the lock."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import threading
+
+        monkeypatch.setattr(dash_app, "_watcher", threading.current_thread())
+        with dash_app._reload_lock:
+            request = threading.Thread(target=dash_app.start_data_watcher)
+            request.start()
+            request.join(timeout=2)
+            assert not request.is_alive(), "A request should not block on a reload in progress"
+        print("✅ Watcher test passed: requests keep serving during a reload")
+
+    def test_date_range_slicing(self):
+        """Test that binary-search date slicing matches a boolean mask over the dates."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        cube = dash_app.daily_sales
+        ranges = [("2020-12-25", "2021-01-20"), (None, "2018-03-01"), ("2022-01-01", None), (None, None)]
+
+        for start, end in ranges:
+            mask = pd.Series(True, index=cube.index)
+            if start:
+                mask &= cube.index >= pd.Timestamp(start)
+            if end:
+                mask &= cube.index <= pd.Timestamp(end)
+
+            pd.testing.assert_frame_equal(dash_app.slice_dates(cube, start, end), cube[mask.to_numpy()])
+
+        figure = dash_app.update_chart("north", "2021-01-01", "2021-01-31")
+        assert len(figure["data"][0]["x"]) == 31, "A January range should chart 31 daily points"
+        print("✅ Date range test passed: searchsorted slices match the mask")
+
+    def test_import_is_light(self):
+        """Test that importing dash_app stays within its startup budget."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import benchmark
+
+        modules, seconds = benchmark.measure_import("dash_app")
+
+        for heavy in ["pandas", "plotly", "dash"]:
+            assert heavy not in modules, f"Importing dash_app should not import {heavy}"
+        assert modules["dash_app"][1] < IMPORT_BUDGET_US, "dash_app import exceeded its startup budget"
+        print(f"✅ Startup test passed: dash_app imports in {seconds * 1000:.1f} ms")
+
+    def test_shared_cube_is_mapped_zero_copy(self, tmp_path):
+        """Test that workers map the shared daily cube read-only instead of loading the CSV."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import numpy as np
+
+        data_file = tmp_path / "formatted_data.csv"
+        data_file.write_bytes(open("formatted_data.csv", "rb").read())
+        cube_file = tmp_path / "formatted_data.cube"
+
+        # The first worker finds no shared file and builds it
+        shared = dash_app.load_snapshot(str(data_file), parquet_path=None, shared_path=str(cube_file))
+        assert cube_file.exists(), "A missing shared cube should be built"
+        if os.name == "posix":
+            from mmap_store import FILE_MODE
+            assert cube_file.stat().st_mode & 0o777 == FILE_MODE, "Workers running as other users should read it"
+        assert shared.df is None, "Workers should not hold the row-level data"
+        assert not shared.daily_sales.to_numpy().flags.writeable, "The mapped cube should be read-only"
+        values = shared.series.values
+        while not isinstance(values, np.memmap) and values.base is not None:
+            values = values.base
+        assert isinstance(values, np.memmap), "Chart series should read the mapped cube, not a copy"
+        pd.testing.assert_frame_equal(shared.daily_sales, dash_app.daily_sales, check_index_type=False)
+
+        # A changed data file makes the shared cube stale, so it is rebuilt
+        data_file.write_text("Sales,Date,Region\n10.0,2021-01-14,north\n")
+        reloaded = dash_app.load_snapshot(str(data_file), parquet_path=None, shared_path=str(cube_file))
+        assert reloaded.version == dash_app.file_version(str(data_file))
+        assert reloaded.daily_sales["all"].tolist() == [10.0]
+        assert shared.daily_sales["all"].sum() > 10.0, "Snapshots already mapped keep their data"
+        print("✅ Shared cube test passed: workers map one read-only copy of the cube")
+
+    def test_template_figure_matches_plotly_express(self):
+        """Test that the pre-serialized figure fast path matches the plotly express figure."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import json
+        import plotly.io as pio
+
+        for region in ["all", "north", "south", "east", "west"]:
+            for start, end in [(None, None), ("2021-01-01", "2021-01-31")]:
+                cube = dash_app.slice_dates(dash_app.daily_sales, start, end)
+                data = dash_app.chart_data(region, dash_app.region_daily_sales(cube, region))
+                fast = dash_app.build_chart(region, data)
+                slow = dash_app.build_figure(data, region)
+
+                assert json.loads(pio.to_json(fast)) == json.loads(pio.to_json(slow)), \
+                    f"Fast path figure for {region} should serialize like the plotly express figure"
+
+        # Editing one returned figure must not leak into the cached template
+        edited = dash_app.build_chart("north", data)
+        edited["layout"]["title"]["text"] = "edited"
+        edited["data"][0]["line"]["color"] = "black"
+        fresh = dash_app.build_chart("north", data)
+        assert fresh["layout"]["title"]["text"] != "edited" and fresh["data"][0]["line"]["color"] != "black"
+        print("✅ Figure test passed: template figures match plotly express output")
+
+    def test_async_chart_matches_sync_chart(self):
+        """Test that the async callback path returns the same figure as the sync one."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import asyncio
+
+        async def fetch_all():
+            return await asyncio.gather(*[
+                dash_app.update_chart_async(region, "2020-06-01", "2021-06-01")
+                for region in ["all", "north", "north", "south"]
+            ])
+
+        figures = asyncio.run(fetch_all())
+        for region, figure in zip(["all", "north", "north", "south"], figures):
+            assert figure == dash_app.update_chart(region, "2020-06-01", "2021-06-01")
+        print("✅ Async test passed: async and sync chart queries agree")
+
+    def test_async_callback_is_a_public_setting(self):
+        """Test that create_app serves charts with the async callback on or off."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import importlib.util
+
+        inputs = [("region-filter", "value", "east"), ("date-range", "start_date", None),
+                  ("date-range", "end_date", None), ("granularity", "value", "day"),
+                  ("overlays", "value", []), ("product", "value", "pink morsel")]
+        body = {"output": "sales-line-chart.figure",
+                "outputs": {"id": "sales-line-chart", "property": "figure"},
+                "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+                "changedPropIds": ["region-filter.value"]}
+        modes = [False] + ([True] if importlib.util.find_spec("asgiref") else [])
+        for use_async in modes:
+            client = dash_app.create_app(use_async=use_async).server.test_client()
+            assert client.post("/_dash-update-component", json=body).status_code == 200
+        print("✅ Async setting test passed: charts are served in every callback mode")
+
+    def test_auto_async_falls_back_on_older_dash(self, monkeypatch):
+        """Test that the default "auto" setting builds a sync app when Dash has no use_async."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import dash
+
+        # Dash 2 rejects the argument outright, even with asgiref installed
+        init = dash.Dash.__init__
+        def dash2_init(self, *args, **kwargs):
+            if "use_async" in kwargs:
+                raise TypeError("Dash() got an unexpected keyword argument 'use_async'")
+            init(self, *args, **kwargs)
+        monkeypatch.setattr(dash.Dash, "__init__", dash2_init)
+        monkeypatch.setattr(dash_app, "DASH_ASYNC", "auto")
+        monkeypatch.setattr(dash_app, "dash_supports_async", lambda: False)
+
+        assert dash_app.create_app().layout is not None
+        with pytest.raises(RuntimeError):
+            dash_app.create_app(use_async=True)
+        print("✅ Async fallback test passed: older Dash gets the sync callback")
+
+    def test_sqlite_backend_matches_csv(self, tmp_path, monkeypatch):
+        """Test that charts queried from the SQLite store match the in-memory cube."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        from sales_store import write_sqlite
+
+        db_file = tmp_path / "formatted_data.db"
+        write_sqlite("formatted_data.csv", str(db_file))
+        monkeypatch.setattr(dash_app, "DATA_BACKEND", "sqlite")
+        monkeypatch.setattr(dash_app, "SQLITE_FILE", str(db_file))
+
+        stored = dash_app.load_snapshot()
+        assert stored.df is None and stored.store is not None, "The SQLite backend should not load rows"
+        for region in ["all", "north", "east"]:
+            for start, end in [(None, None), ("2020-06-01", "2021-06-01")]:
+                pd.testing.assert_frame_equal(
+                    dash_app.query_sales(region, stored, start, end),
+                    dash_app.query_sales(region, dash_app.snapshot, start, end),
+                    check_dtype=False, check_exact=False,
+                )
+        print("✅ SQLite backend test passed: store queries match the CSV data")
+
+    def test_granularity_serves_rollups(self):
+        """Test that weekly and monthly charts come from the precomputed rollups."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        # A snapshot without row-level data, so any raw recomputation would fail
+        current = dash_app.snapshot._replace(df=None)
+        for granularity in ["week", "month"]:
+            data = dash_app.query_sales("north", current, "2020-06-01", "2021-06-01", granularity)
+            expected = dash_app.region_daily_sales(
+                dash_app.slice_dates(current.rollups[granularity], "2020-06-01", "2021-06-01"), "north"
+            )
+            pd.testing.assert_frame_equal(data, expected)
+            assert data["Sales"].sum() < dash_app.query_sales("north", current)["Sales"].sum()
+
+        weekly = dash_app.update_chart("all", granularity="week")
+        assert "Weekly" in weekly["layout"]["title"]["text"]
+        assert len(weekly["data"][0]["x"]) < len(dash_app.update_chart("all")["data"][0]["x"])
+        print("✅ Granularity test passed: rollups are served without touching raw rows")
+
+    def test_impact_summary_matches_per_region_means(self):
+        """Test that the vectorized impact statistics match per-region filtered means."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        df = dash_app.df
+        impact = dash_app.price_impact(dash_app.snapshot)
+        assert list(impact.index) == ["all", "east", "north", "south", "west"]
+
+        for region, stats in impact.iterrows():
+            rows = df if region == "all" else df[df["Region"] == region]
+            daily = rows.groupby("Date")["Sales"].sum()
+            before = daily[daily.index < dash_app.PRICE_INCREASE_DATE]
+            after = daily[daily.index >= dash_app.PRICE_INCREASE_DATE]
+            assert stats["before_mean"] == pytest.approx(before.mean())
+            assert stats["after_mean"] == pytest.approx(after.mean())
+            assert stats["pct_change"] == pytest.approx((after.mean() - before.mean()) / before.mean() * 100)
+            assert stats["ci_low"] < stats["delta"] < stats["ci_high"]
+
+        assert dash_app.price_impact(dash_app.snapshot) is impact, "Statistics should be cached per data version"
+        assert dash_app.update_impact_summary("north") is not None
+        print("✅ Impact test passed: vectorized statistics match per-region means")
+
+    def test_event_markers_overlay_chart(self, monkeypatch):
+        """Test that every configured event gets a line and a marker with its windowed impact."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import json
+        from datetime import datetime
+        import plotly.io as pio
+
+        events = [dash_app.PRICE_INCREASE_DATE, datetime(2020, 6, 1), datetime(2030, 1, 1)]
+        monkeypatch.setattr(dash_app, "EVENT_DATES", events)
+        monkeypatch.setattr(dash_app, "EVENT_WINDOW_DAYS", 14)
+        monkeypatch.setattr(dash_app, "impact_cache", dash_app.FigureCache())
+        monkeypatch.setattr(dash_app, "_figure_templates", dash_app.FigureCache())
+
+        current = dash_app.snapshot
+        data = dash_app.chart_data("south", dash_app.query_sales("south", current))
+        markers = dash_app.event_markers("south", current, data)
+        assert markers["x"] == ["2020-06-01T00:00:00", "2021-01-15T00:00:00"], "Events outside the data are skipped"
+        assert "14 days before" in markers["hovertext"][0]
+
+        impacts = dash_app.event_impacts(current)
+        daily = current.daily_sales["south"]
+        before = daily[(daily.index >= "2021-01-01") & (daily.index < "2021-01-15")]
+        assert impacts.loc[(dash_app.PRICE_INCREASE_DATE, "south"), "before_mean"] == pytest.approx(before.mean())
+
+        fast = dash_app.build_chart("south", data, "day", [markers])
+        slow = dash_app.build_figure(data, "south", "day", [markers])
+        assert len(fast["layout"]["shapes"]) == len(events)
+        assert json.loads(pio.to_json(fast)) == json.loads(pio.to_json(slow))
+        print("✅ Event marker test passed: each event is drawn with its windowed impact")
+
+    def test_overlays_extend_on_appended_days(self, tmp_path, monkeypatch):
+        """Test that overlays are drawn and rolling means are extended when days are appended."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        figure = dash_app.update_chart("east", "2020-06-01", "2021-06-01", "day", ["rolling-7", "trend"])
+        names = [trace.get("name") for trace in figure["data"]]
+        assert "7-day average" in names and "Trend" in names
+        weekly = dash_app.update_chart("east", None, None, "week", ["rolling-7"])
+        assert "7-day average" not in [trace.get("name") for trace in weekly["data"]], "Overlays are daily only"
+
+        monkeypatch.setattr(dash_app, "_rolling", {})
+        original = dash_app.snapshot
+        data_file = tmp_path / "formatted_data.csv"
+        rows = ["Sales,Date,Region"] + [f"{10.0 + day},2021-02-{day:02d},north" for day in range(1, 21)]
+        data_file.write_text("\n".join(rows[:11]) + "\n")
+        try:
+            dash_app.refresh_data(str(data_file), parquet_path=None)
+            first = dash_app.rolling_means(dash_app.snapshot)
+
+            data_file.write_text("\n".join(rows) + "\n")
+            os.utime(data_file, ns=(0, 0))
+            dash_app.refresh_data(str(data_file), parquet_path=None)
+            second = dash_app.rolling_means(dash_app.snapshot)
+        finally:
+            dash_app.install_snapshot(original)
+
+        assert second is not first and second.means[7].iloc[:10].equals(first.means[7])
+        assert second.means[7]["north"].iloc[-1] == pytest.approx(sum(range(14, 21)) / 7 + 10.0)
+        print("✅ Overlay test passed: rolling means are drawn and extended incrementally")
+
+    def test_metrics_endpoint_reports_chart_spans(self):
+        """Test that enabled instrumentation times each chart stage and serves it at /_metrics."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import instrumentation
+
+        instrumentation.reset()
+        instrumentation.enable(log=False)
+        try:
+            dash_app.figure_cache.clear()
+            dash_app.update_chart("west", "2020-01-01", "2020-12-31")
+        finally:
+            instrumentation.disable()
+
+        metrics = dash_app.app.server.test_client().get("/_metrics").get_json()
+        for stage in ["chart.query", "chart.downsample", "chart.overlays", "chart.build"]:
+            assert metrics["spans"][stage]["count"] == 1, f"{stage} should be timed once"
+        assert metrics["counters"]["chart.query.rows"] == 366
+        assert metrics["counters"]["chart.requests"] == 1
+        print("✅ Metrics test passed: chart stages are timed and served")
+
+    def test_series_store_serves_daily_charts(self, monkeypatch):
+        """Test that daily charts come from the compact store, with or without row-level data."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        monkeypatch.setattr(dash_app, "KEEP_ROW_DATA", False)
+        compact = dash_app.load_snapshot()
+        assert compact.df is None and compact.series is not None
+
+        # The rows are only loaded when asked for, then kept for the data version
+        rows = dash_app.row_data(compact)
+        assert len(rows) > 0 and dash_app.row_data(compact) is rows
+
+        for region in ["all", "south"]:
+            pd.testing.assert_frame_equal(
+                dash_app.query_sales(region, compact, "2019-06-01", "2019-06-30"),
+                dash_app.region_daily_sales(
+                    dash_app.slice_dates(compact.daily_sales, "2019-06-01", "2019-06-30"), region
+                ),
+                check_dtype=False, check_exact=False,
+            )
+        # Against the long-format frame parsed from the CSV (dash_app.df may be mapped from the cache)
+        assert compact.series.nbytes < dash_app.load_data().memory_usage(deep=True).sum() / 2
+        print("✅ Series store test passed: charts no longer need the long-format frame")
+
+    def test_product_picker_reads_only_its_partition(self, tmp_path, monkeypatch):
+        """Test that charting another product loads only that product's partition."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import process_data
+        from partitions import read_index
+
+        csv_file = tmp_path / "formatted_data.csv"
+        partition_dir = tmp_path / "partitions"
+        process_data.process_partitioned(
+            process_data.DATA_FILES, csv_file, partition_dir, ["gold morsel", "lapis morsel"]
+        )
+        monkeypatch.setattr(dash_app, "DATA_FILE", str(csv_file))
+        monkeypatch.setattr(dash_app, "PARTITION_DIR", str(partition_dir))
+        assert [o["value"] for o in dash_app.product_options()] == ["pink morsel", "gold morsel", "lapis morsel"]
+
+        # Without the other product's files, only the requested partition can be read
+        shutil.rmtree(partition_dir / read_index(partition_dir)["run"] / "lapis_morsel")
+        figure = dash_app.update_chart("north", product="gold morsel")
+        assert figure["layout"]["title"]["text"] == "Gold Morsel Daily Sales - North Region"
+
+        gold = dash_app.product_snapshot(dash_app.snapshot, "gold morsel")
+        assert gold.product == "gold morsel" and gold.daily_sales is not dash_app.daily_sales
+        assert dash_app.product_snapshot(dash_app.snapshot, "gold morsel") is gold, "Partitions load once per version"
+        assert dash_app.update_chart("north") != figure, "The default product should still be charted"
+
+        # A product without current partitions falls back to the default product
+        current = dash_app.snapshot
+        assert dash_app.product_snapshot(current, "violet morsel") is current
+        csv_file.write_text(csv_file.read_text() + "1.0,2022-12-31,north\n")
+        assert dash_app.available_products() == ["pink morsel"], "Partitions of an older CSV should not be served"
+        assert dash_app.product_snapshot(current._replace(version="newer"), "lapis morsel").product == "pink morsel"
+        print("✅ Product test passed: each product's chart reads its own partition")
+
+    def test_data_cache_is_mapped_and_rebuilt_on_change(self, tmp_path, monkeypatch):
+        """Test that the binary cache is reused while the CSV is unchanged and rebuilt when it changes."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import numpy as np
+
+        monkeypatch.setattr(dash_app, "KEEP_ROW_DATA", True)
+        csv_file = tmp_path / "formatted_data.csv"
+        shutil.copy("formatted_data.csv", csv_file)
+        loads = []
+        load_data = dash_app.load_data
+        monkeypatch.setattr(dash_app, "load_data", lambda *args: loads.append(args) or load_data(*args))
+
+        df, cube, rollups = dash_app.load_cached_data(str(csv_file), None)
+        assert (tmp_path / "formatted_data.cache").exists() and len(loads) == 1
+
+        # Unchanged, or only touched: served from the map without parsing the CSV
+        import checksums
+        hashes = []
+        file_hash = checksums.file_hash
+        monkeypatch.setattr(checksums, "file_hash", lambda path: hashes.append(path) or file_hash(path))
+        for _ in range(2):
+            mapped_df, mapped_cube, mapped_rollups = dash_app.load_cached_data(str(csv_file), None)
+            os.utime(csv_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert len(loads) == 1, "A current cache should not reparse the CSV"
+        assert len(hashes) == 1, "A touched CSV should be hashed once, then the cache re-tagged"
+        dash_app.load_cached_data(str(csv_file), None)
+        assert len(hashes) == 2 and len(loads) == 1
+        dash_app.load_cached_data(str(csv_file), None)
+        assert len(hashes) == 2, "The re-tagged cache should be current without hashing"
+        base = mapped_df["Sales"].to_numpy()
+        while not isinstance(base, np.memmap) and base.base is not None:
+            base = base.base
+        assert isinstance(base, np.memmap), "Rows should be views of the mapped cache"
+        pd.testing.assert_frame_equal(mapped_df, df)
+        pd.testing.assert_frame_equal(mapped_cube, cube, check_freq=False)
+        pd.testing.assert_frame_equal(mapped_rollups["month"], rollups["month"], check_freq=False)
+
+        # Changed rows: the cache is rebuilt from the new CSV
+        pd.read_csv(csv_file).assign(Sales=lambda d: d["Sales"] * 2).to_csv(csv_file, index=False)
+        _, doubled, _ = dash_app.load_cached_data(str(csv_file), None)
+        assert len(loads) == 2
+        assert doubled["all"].sum() == pytest.approx(cube["all"].sum() * 2)
+
+        # A cache of another layout version is rebuilt too
+        monkeypatch.setattr(dash_app, "CACHE_FORMAT", dash_app.CACHE_FORMAT + 1)
+        dash_app.load_cached_data(str(csv_file), None)
+        assert len(loads) == 3
+
+        # Hashing the CSV must not pull in the ETL module (its data glob, stores and partitions)
+        import subprocess
+        script = (f"import sys, dash_app; dash_app.load_cached_data({str(csv_file)!r}, None); "
+                  "print('process_data' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False", "Loading the data should not import process_data"
+        print("✅ Data cache test passed: mapped while current, rebuilt when the source changes")
+
+    def test_payload_stats_are_sized_without_encoding(self):
+        """Test that payload sizes are estimated from array lengths and match the sent figure."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+        import json
+
+        data = dash_app.query_sales("north", dash_app.snapshot)
+        trace = dash_app.build_chart("north", dash_app.chart_data("north", data))["data"][0]
+        sent = len(json.dumps({"x": trace["x"], "y": trace["y"]["bdata"]}))
+        weekly = dash_app.query_sales("north", dash_app.snapshot, granularity="week")
+        dash_app.chart_data("north", weekly, granularity="week")
+        payload = dash_app.get_app().server.test_client().get("/_chart_payload").get_json()
+        stats = payload["pink morsel/north/day"]
+        assert stats["points_after"] == len(trace["x"])
+        assert stats["bytes_after"] == pytest.approx(sent, rel=0.1)
+        assert payload["pink morsel/north/week"]["points_before"] == len(weekly), "Each chart line has its own stats"
+        print("✅ Payload test passed: sizes are estimated from the arrays")
+
+    def test_downsampling_keeps_the_price_increase(self, monkeypatch):
+        """Test that the points either side of the price increase survive without any EVENT_DATES."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        monkeypatch.setattr(dash_app, "EVENT_DATES", [])
+        data = dash_app.downsample_daily_sales(dash_app.query_sales("north", dash_app.snapshot), max_points=50)
+        dates = set(data["Date"].dt.strftime("%Y-%m-%d"))
+        assert {"2021-01-14", "2021-01-15"} <= dates, "The price increase step should always be drawn"
+        print("✅ Downsampling test passed: the price increase is kept")
+
+    def test_charts_render_without_event_dates(self, monkeypatch):
+        """Test that EVENT_DATES="" turns the event markers off instead of failing every chart."""
+        if dash_app is None:
+            pytest.skip("dash_app could not be imported")
+
+        monkeypatch.setattr(dash_app, "EVENT_DATES", [])
+        caches = [dash_app.impact_cache, dash_app.figure_cache]
+        for cache in caches:
+            cache.clear()
+        assert dash_app.event_impacts(dash_app.snapshot).empty
+        figure = dash_app.update_chart("east", "2020-06-01", "2021-06-01")
+        assert [trace.get("name") for trace in figure["data"]].count("Events") == 0
+        for cache in caches:
+            cache.clear()
+        print("✅ No events test passed: charts render without markers")
+
 
 def run_all_tests():
     """Run all tests and provide a summary."""
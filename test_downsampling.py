@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from downsampling import downsample_indices, lttb_indices
+
+
+class TestDownsampling:
+    """Test suite for LTTB chart downsampling."""
+
+    def test_short_series_are_untouched(self):
+        """Series within the point budget should be returned whole."""
+        x = np.arange(10)
+        assert downsample_indices(x, x * 2.0, max_points=10).tolist() == list(range(10))
+        print("✅ Budget test passed: short series are not downsampled")
+
+    def test_lttb_respects_budget_and_keeps_shape(self):
+        """LTTB should keep the endpoints and a lone spike within the budget."""
+        x = np.arange(10_000)
+        y = np.sin(x / 500.0)
+        y[4321] = 50.0
+
+        keep = lttb_indices(x, y, 300)
+
+        assert len(keep) == 300, "LTTB should return exactly the point budget"
+        assert keep[0] == 0 and keep[-1] == len(x) - 1, "Endpoints should be kept"
+        assert (np.diff(keep) > 0).all(), "Indices should be strictly increasing"
+        assert 4321 in keep, "A visually dominant spike should survive downsampling"
+        print("✅ LTTB test passed: budget respected and shape preserved")
+
+    def test_points_around_breakpoint_are_kept(self):
+        """The last point before and the first point after a breakpoint must survive."""
+        x = np.arange(0, 20_000, 2)
+        y = np.cos(x / 300.0)
+        breakpoint = 12_345
+
+        keep = downsample_indices(x, y, max_points=100, breakpoints=[breakpoint])
+        kept_x = x[keep]
+
+        assert len(keep) <= 102, "Splitting at a breakpoint should stay close to the budget"
+        assert 12_344 in kept_x and 12_346 in kept_x, "Points either side of the breakpoint should be kept"
+        print("✅ Breakpoint test passed: points around the marker are kept")
@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from figure_cache import FigureCache
+
+
+class TestFigureCache:
+    """Test suite for the chart figure LRU cache."""
+
+    def test_hits_and_misses_are_counted(self):
+        """Repeated keys should be served from the cache."""
+        cache = FigureCache(maxsize=4)
+        builds = []
+
+        for region in ["all", "north", "all", "all", "north"]:
+            value = cache.get_or_build(region, "v1", lambda: builds.append(region) or f"figure-{region}")
+            assert value == f"figure-{region}"
+
+        assert builds == ["all", "north"], "Each region should be built once"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (3, 2, 2)
+        print("✅ Counter test passed: hits and misses are tracked")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache should stay bounded by evicting the least recently used key."""
+        cache = FigureCache(maxsize=2)
+        cache.get_or_build("north", "v1", lambda: "n")
+        cache.get_or_build("south", "v1", lambda: "s")
+        cache.get_or_build("north", "v1", lambda: "n")
+        cache.get_or_build("east", "v1", lambda: "e")
+
+        rebuilt = []
+        cache.get_or_build("north", "v1", lambda: rebuilt.append("north"))
+        cache.get_or_build("south", "v1", lambda: rebuilt.append("south"))
+
+        assert rebuilt == ["south"], "South was least recently used and should have been evicted"
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["evictions"] >= 1
+        print("✅ Eviction test passed: cache is bounded with LRU eviction")
+
+    def test_new_data_version_invalidates_entries(self):
+        """A new data version should never be served a figure built from older data."""
+        cache = FigureCache(maxsize=4)
+        cache.get_or_build("all", "v1", lambda: "old")
+
+        assert cache.get_or_build("all", "v2", lambda: "new") == "new"
+        assert cache.get_or_build("all", "v2", lambda: "newer") == "new"
+        print("✅ Invalidation test passed: data version changes clear the cache")
@@ -0,0 +1,312 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import process_data
+
+
+class TestProcessData:
+    """Test suite for the Pink Morsel ETL in process_data.py."""
+
+    def test_batch_matches_committed_output(self, tmp_path):
+        """The batch path should reproduce the committed formatted_data.csv."""
+        output_file = tmp_path / "formatted_data.csv"
+        process_data.process_batch(output_file=output_file)
+
+        with open("formatted_data.csv", "rb") as expected, open(output_file, "rb") as actual:
+            assert actual.read() == expected.read(), "Batch output should match formatted_data.csv"
+
+        print("✅ Batch test passed: output matches formatted_data.csv")
+
+    def test_streaming_is_byte_identical(self, tmp_path):
+        """Streaming in small chunks should write exactly the batch output."""
+        batch_file = tmp_path / "batch.csv"
+        stream_file = tmp_path / "stream.csv"
+
+        process_data.process_batch(output_file=batch_file)
+        rows = process_data.process_streaming(output_file=stream_file, chunksize=997)
+
+        assert rows == len(pd.read_csv(batch_file)), "Streaming should report every output row"
+        assert stream_file.read_bytes() == batch_file.read_bytes(), "Streaming output should be byte-identical"
+
+        print("✅ Streaming test passed: chunked output is byte-identical to batch output")
+
+    def test_discover_data_files_in_numeric_order(self, tmp_path):
+        """Input discovery should order daily_sales_data_10 after daily_sales_data_2."""
+        for index in [10, 0, 2, 1]:
+            (tmp_path / f"daily_sales_data_{index}.csv").write_text("product,price,quantity,date,region\n")
+
+        files = process_data.discover_data_files(str(tmp_path / "daily_sales_data_*.csv"))
+        names = [os.path.basename(path) for path in files]
+
+        assert names == [f"daily_sales_data_{index}.csv" for index in [0, 1, 2, 10]]
+        print("✅ Discovery test passed: input files are in numeric order")
+
+    def test_parallel_shards_are_byte_identical(self, tmp_path):
+        """Sharded parallel processing should merge back to exactly the batch output."""
+        batch_file = tmp_path / "batch.csv"
+        parallel_file = tmp_path / "parallel.csv"
+
+        process_data.process_batch(output_file=batch_file)
+        shards = process_data.shard_file(process_data.DATA_FILES[0], shard_bytes=50_000)
+        assert len(shards) > 1, "A small shard size should split the file"
+
+        process_data.process_parallel(output_file=parallel_file, workers=2, shard_bytes=50_000)
+
+        assert parallel_file.read_bytes() == batch_file.read_bytes(), "Parallel output should be byte-identical"
+        print("✅ Parallel test passed: sharded output is byte-identical to batch output")
+
+    def test_parallel_keeps_a_bounded_window_of_shards(self, tmp_path, monkeypatch):
+        """Only a couple of shards per worker should be in flight, and unused flags should be rejected."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        outstanding = []
+        peak = [0]
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, *args):
+                outstanding.append(None)
+                peak[0] = max(peak[0], len(outstanding))
+                future = super().submit(fn, *args)
+                result = future.result
+                future.result = lambda: outstanding.pop() or result()
+                return future
+
+        monkeypatch.setattr(process_data, 'ProcessPoolExecutor', RecordingExecutor)
+        output_file = tmp_path / 'parallel.csv'
+        process_data.process_parallel(output_file=output_file, workers=2, shard_bytes=5_000)
+
+        assert len(process_data.shard_file(process_data.DATA_FILES[0], 5_000)) > 4
+        assert peak[0] == 4, "At most two shards per worker should be in flight"
+        with open('formatted_data.csv', 'rb') as expected:
+            assert output_file.read_bytes() == expected.read()
+
+        for argv in (['--shard-mb', '1'], ['--workers', '2', '--chunksize', '1000']):
+            with pytest.raises(SystemExit):
+                process_data.parse_args(argv)
+        print("✅ Window test passed: parallel shards are submitted through a bounded window")
+
+    def test_incremental_only_reprocesses_changed_files(self, tmp_path):
+        """Incremental runs should skip unchanged inputs and still match the batch output."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        for path in process_data.DATA_FILES:
+            shutil.copy(path, data_dir / os.path.basename(path))
+        data_files = process_data.discover_data_files(str(data_dir / "daily_sales_data_*.csv"))
+
+        cache_dir = tmp_path / "cache"
+        output_file = tmp_path / "formatted_data.csv"
+        batch_file = tmp_path / "batch.csv"
+
+        first = process_data.process_incremental(data_files, output_file, cache_dir)
+        assert first == data_files, "The first run should process every input"
+
+        second = process_data.process_incremental(data_files, output_file, cache_dir)
+        assert second == [], "A rerun with no changes should reprocess nothing"
+
+        # Touching a file without changing it should be caught by the content hash
+        os.utime(data_files[0], ns=(0, 0))
+        assert process_data.process_incremental(data_files, output_file, cache_dir) == []
+
+        # A new daily file lands and an existing one changes
+        new_file = data_dir / "daily_sales_data_3.csv"
+        new_file.write_text("product,price,quantity,date,region\npink morsel,$5.00,10,2022-02-15,north\n")
+        with open(data_files[1], "a", encoding="utf-8") as f:
+            f.write("pink morsel,$5.00,20,2022-02-16,south\n")
+        data_files = process_data.discover_data_files(str(data_dir / "daily_sales_data_*.csv"))
+
+        # Changed inputs are streamed into their fragments in chunks
+        third = process_data.process_incremental(data_files, output_file, cache_dir, chunksize=997)
+        assert third == [data_files[1], str(new_file)], "Only the changed and new inputs should be reprocessed"
+
+        process_data.process_batch(data_files, batch_file)
+        assert output_file.read_bytes() == batch_file.read_bytes(), "Spliced output should match a full rebuild"
+        print("✅ Incremental test passed: only new or changed inputs are reprocessed")
+
+    def test_parquet_output_is_typed(self, tmp_path):
+        """The columnar copy should hold the CSV rows with date, dictionary and float64 types."""
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        parquet_file = tmp_path / "formatted_data.parquet"
+        process_data.write_parquet("formatted_data.csv", parquet_file, chunksize=1000)
+
+        table = pq.read_table(parquet_file)
+        assert table.schema.field("Date").type == pa.date32()
+        assert pa.types.is_dictionary(table.schema.field("Region").type)
+        assert table.schema.field("Sales").type == pa.float64()
+
+        expected = pd.read_csv("formatted_data.csv", parse_dates=["Date"])
+        actual = table.to_pandas(date_as_object=False)
+        assert actual["Sales"].tolist() == expected["Sales"].tolist()
+        assert actual["Region"].astype(str).tolist() == expected["Region"].tolist()
+        assert (actual["Date"].values == expected["Date"].values).all()
+        print("✅ Parquet test passed: columnar copy is typed and matches the CSV")
+
+    def test_sqlite_store_answers_from_index(self, tmp_path):
+        """The SQLite store should return the groupby totals via an index range scan."""
+        from sales_store import SqliteSalesStore
+
+        db_file = tmp_path / "formatted_data.db"
+        process_data.write_sqlite("formatted_data.csv", str(db_file), chunksize=1000)
+        store = SqliteSalesStore(str(db_file))
+
+        df = pd.read_csv("formatted_data.csv", parse_dates=["Date"])
+        assert store.regions() == sorted(df["Region"].unique())
+
+        window = df[(df["Date"] >= "2021-01-01") & (df["Date"] <= "2021-01-31")]
+        for region in ["all", "north", "west"]:
+            rows = window if region == "all" else window[window["Region"] == region]
+            expected = rows.groupby("Date")["Sales"].sum().reset_index()
+            actual = store.daily_sales(region, "2021-01-01", "2021-01-31")
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_exact=False)
+
+        plan = store._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT date, sales FROM daily_sales WHERE region = ? AND date >= ? AND date <= ?",
+            ("north", "2021-01-01", "2021-01-31"),
+        ).fetchall()
+        assert "SEARCH" in str(plan), f"Range queries should use the (region, date) key: {plan}"
+        print("✅ SQLite test passed: range queries are index scans matching the CSV totals")
+
+    def test_rollups_sum_daily_totals(self, tmp_path):
+        """Weekly and monthly rollups should sum each region's daily totals per period."""
+        from rollups import read_rollups
+
+        rollup_file = tmp_path / "formatted_rollups.csv"
+        rollups = process_data.compute_rollups("formatted_data.csv", rollup_file, chunksize=1000)
+
+        df = pd.read_csv("formatted_data.csv", parse_dates=["Date"])
+        for granularity, period in [("week", "W-SUN"), ("month", "M")]:
+            cube = rollups[granularity]
+            assert list(cube.columns) == sorted(df["Region"].unique()) + ["all"]
+
+            # Periods are labelled by their first day
+            starts = df["Date"].dt.to_period(period).dt.start_time
+            expected = df[df["Region"] == "south"].groupby(starts)["Sales"].sum()
+            assert cube["south"].dropna().tolist() == pytest.approx(expected.tolist())
+            assert cube["all"].sum() == pytest.approx(df["Sales"].sum())
+
+            pd.testing.assert_frame_equal(read_rollups(rollup_file)[granularity], cube, check_freq=False)
+        print("✅ Rollup test passed: weekly and monthly totals match the daily rows")
+
+    def test_partitioned_output_in_one_scan(self, tmp_path, monkeypatch):
+        """Every product should be partitioned by region from a single read of each input."""
+        from partitions import partition_products, read_index, read_partition
+
+        reads = []
+        read_raw = process_data.read_raw
+        monkeypatch.setattr(process_data, 'read_raw', lambda path, **kw: reads.append(path) or read_raw(path, **kw))
+
+        output = tmp_path / 'formatted_data.csv'
+        partition_dir = tmp_path / 'partitions'
+        products = process_data.process_partitioned(process_data.DATA_FILES, output, partition_dir, chunksize=5000)
+        assert reads == process_data.DATA_FILES, "Each input should be read exactly once"
+        assert output.read_bytes() == open('formatted_data.csv', 'rb').read()
+
+        raw = pd.concat([read_raw(file) for file in process_data.DATA_FILES], ignore_index=True)
+        assert products == partition_products(partition_dir) == sorted(raw['product'].unique())
+
+        gold = read_partition('gold morsel', partition_dir, output)
+        run_dir = partition_dir / read_index(partition_dir)['run']
+        assert sorted(os.listdir(run_dir / 'gold_morsel')) == [f'{r}.csv' for r in sorted(gold['Region'].unique())]
+        expected = raw[raw['product'] == 'gold morsel']
+        cents = expected['price'].astype(str).map(process_data.currency_to_cents)
+        assert gold['Sales'].sum() == pytest.approx((cents / 100 * expected['quantity']).sum())
+
+        # Restricting the products only changes what is kept, not how much is read
+        reads.clear()
+        kept = process_data.process_partitioned(
+            process_data.DATA_FILES, output, partition_dir, products=['gold morsel']
+        )
+        assert kept == ['gold morsel'] and reads == process_data.DATA_FILES
+        assert partition_products(partition_dir) == ['gold morsel']
+        assert len([name for name in os.listdir(partition_dir) if name.startswith('run-')]) == 2, \
+            "Only the published run and the one before it should be kept"
+
+        # A later output without partitioning leaves them stale for that output
+        process_data.process_batch(process_data.DATA_FILES[:1], output)
+        assert partition_products(partition_dir, output) == []
+        with pytest.raises(KeyError):
+            read_partition('gold morsel', partition_dir, output)
+        print("✅ Partition test passed: one scan writes every product and region")
+
+    def test_out_of_core_aggregation_with_tiny_ceiling(self, tmp_path, monkeypatch):
+        """Spilled, partitioned totals under a tiny memory ceiling should match the in-memory groupby."""
+        daily_file = tmp_path / 'formatted_daily.csv'
+        spill_dir = tmp_path / 'spill'
+
+        # One initial partition cannot hold every day's totals, so it has to be split
+        depths = []
+        aggregate_spill = process_data.aggregate_spill
+        monkeypatch.setattr(process_data, 'aggregate_spill',
+                            lambda path, *args: depths.append(args[2:]) or aggregate_spill(path, *args))
+        rows = process_data.aggregate_out_of_core(
+            process_data.DATA_FILES, daily_file, memory_limit=64 * 1024, spill_dir=spill_dir, partitions=1
+        )
+        assert (1,) in depths, "The oversized partition should have been split"
+        assert os.listdir(spill_dir) == [], "Spill files should be removed"
+
+        df = pd.read_csv('formatted_data.csv')
+        expected = df.groupby(['Date', 'Region'], as_index=False)['Sales'].sum()
+        actual = pd.read_csv(daily_file)
+        assert rows == len(expected)
+        pd.testing.assert_frame_equal(actual[['Date', 'Region']], expected[['Date', 'Region']])
+        assert actual['Sales'].tolist() == pytest.approx(expected['Sales'].tolist())
+
+        with pytest.raises(MemoryError):
+            process_data.aggregate_out_of_core(process_data.DATA_FILES, daily_file, memory_limit=500, spill_dir=spill_dir)
+        print("✅ Out-of-core test passed: spilled partitions total correctly under the ceiling")
+
+    def test_out_of_core_command_scans_inputs_once(self, tmp_path, monkeypatch):
+        """--out-of-core should write the output and daily totals in one bounded scan, without process_batch."""
+        output_file = tmp_path / 'formatted_data.csv'
+        daily_file = tmp_path / 'formatted_daily.csv'
+        monkeypatch.setattr(process_data, 'OUTPUT_FILE', str(output_file))
+        monkeypatch.setattr(process_data, 'DAILY_FILE', str(daily_file))
+        monkeypatch.setattr(process_data, 'ROLLUP_FILE', str(tmp_path / 'formatted_rollups.csv'))
+
+        def process_batch(*args, **kwargs):
+            raise AssertionError('process_batch should not run with --out-of-core')
+        monkeypatch.setattr(process_data, 'process_batch', process_batch)
+
+        # Every full read of a raw file must be chunked; chunk_rows only samples the first rows
+        reads = []
+        read_raw = process_data.read_raw
+        def counting_read_raw(path, **kwargs):
+            if 'nrows' not in kwargs:
+                assert kwargs.get('chunksize'), 'Raw files should be read in chunks'
+                reads.append(path)
+            return read_raw(path, **kwargs)
+        monkeypatch.setattr(process_data, 'read_raw', counting_read_raw)
+
+        args = process_data.parse_args(
+            ['--out-of-core', '--memory-limit-mb', '0.0625', '--spill-dir', str(tmp_path / 'spill')]
+        )
+        process_data.run_outputs(args)
+
+        assert reads == process_data.DATA_FILES, "Each input should be scanned exactly once"
+        with open('formatted_data.csv', 'rb') as expected:
+            assert output_file.read_bytes() == expected.read(), "The output should match the batch output"
+        assert len(pd.read_csv(daily_file)) == len(pd.read_csv(output_file).groupby(['Date', 'Region']))
+
+        for argv in (['--out-of-core', '--workers', '2'], ['--out-of-core', '--chunksize', '1000']):
+            with pytest.raises(SystemExit):
+                process_data.parse_args(argv)
+        print("✅ Out-of-core command test passed: one bounded scan writes the output and totals")
+
+    def test_price_cents_matches_text_parsing(self):
+        """Integer-cent pricing should give the same floats as parsing the dollar strings."""
+        raw = process_data.read_raw(process_data.DATA_FILES[0])
+        assert isinstance(raw["product"].dtype, pd.CategoricalDtype), "product should be read as a categorical"
+
+        cents = process_data.price_cents(raw["price"])
+        from_text = raw["price"].astype(str).str.replace("$", "", regex=False).astype(float)
+
+        assert ((cents / 100) == from_text.to_numpy()).all(), "Cents should convert back to the parsed prices"
+        assert process_data.currency_to_cents("$1,234.5") == 123450
+        print("✅ Price test passed: integer cents match the text prices")
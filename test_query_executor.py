@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from query_executor import QueryExecutor
+
+
+class TestQueryExecutor:
+    """Test suite for the thread-pool query executor."""
+
+    def test_duplicate_in_flight_queries_are_coalesced(self):
+        """Concurrent queries for one key should share a single computation."""
+        executor = QueryExecutor(max_workers=4)
+        release = threading.Event()
+        calls = []
+
+        def slow_query():
+            calls.append(1)
+            release.wait(5)
+            return "north figure"
+
+        futures = [executor.submit("north", slow_query) for _ in range(5)]
+        release.set()
+
+        assert [future.result(5) for future in futures] == ["north figure"] * 5
+        assert len(calls) == 1, "Only one computation should run for duplicate keys"
+        assert executor.stats()["coalesced"] == 4
+        assert executor.stats()["in_flight"] == 0, "Finished queries should be forgotten"
+        executor.shutdown()
+        print("✅ Coalescing test passed: duplicate in-flight queries share one result")
+
+    def test_different_keys_run_in_parallel(self):
+        """Queries for different keys should run concurrently on the pool."""
+        executor = QueryExecutor(max_workers=4)
+        # Both queries must be running at once for the barrier to release
+        barrier = threading.Barrier(2, timeout=5)
+
+        def query(region):
+            barrier.wait()
+            return region
+
+        async def main():
+            return await asyncio.gather(
+                executor.query("north", query, "north"),
+                executor.query("south", query, "south"),
+            )
+
+        start = time.perf_counter()
+        assert asyncio.run(main()) == ["north", "south"]
+        assert time.perf_counter() - start < 5
+        executor.shutdown()
+        print("✅ Parallel test passed: different keys run concurrently")
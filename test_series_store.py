@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from series_store import SeriesStore
+
+
+def load_rows():
+    df = pd.read_csv("formatted_data.csv")
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+class TestSeriesStore:
+    """Test suite for the array-backed per-region series store."""
+
+    def test_store_matches_groupby(self):
+        """Each region's series should equal filtering and grouping the long frame."""
+        df = load_rows()
+        store = SeriesStore.from_frame(df)
+
+        assert set(store.regions) == set(df["Region"].unique()) | {"all"}
+        assert store.values.shape == (df["Date"].nunique(), len(store.regions))
+        assert store.values.flags["C_CONTIGUOUS"]
+
+        for region in ["north", "all"]:
+            rows = df if region == "all" else df[df["Region"] == region]
+            window = rows[(rows["Date"] >= "2020-03-01") & (rows["Date"] <= "2020-04-30")]
+            expected = window.groupby("Date")["Sales"].sum()
+
+            dates, values = store.series(region, "2020-03-01", "2020-04-30")
+            assert (dates == expected.index.to_numpy(dtype="datetime64[ns]")).all()
+            np.testing.assert_allclose(values, expected.to_numpy())
+        print("✅ Store test passed: series match the long-format groupby")
+
+    def test_all_is_row_sum_and_gaps_are_skipped(self):
+        """"all" should be the row-sum of regions, and missing days should be left out."""
+        cube = pd.DataFrame(
+            {"east": [1.0, np.nan, 3.0], "west": [10.0, 20.0, np.nan]},
+            index=pd.to_datetime(["2021-01-01", "2021-01-02", "2021-01-03"]),
+        )
+        store = SeriesStore.from_cube(cube)
+
+        assert store.series("all")[1].tolist() == [11.0, 20.0, 3.0]
+        assert store.frame("east")["Sales"].tolist() == [1.0, 3.0]
+        assert len(store.frame("nowhere")) == 0
+        assert store.nbytes == 3 * 8 + 3 * 3 * 8
+        print("✅ Row-sum test passed: \"all\" is precomputed and gaps are skipped")
+
+    def test_cube_with_all_is_wrapped_without_copy(self):
+        """A float64 cube that already has "all" should lend its matrix, "all" included."""
+        values = np.array([[1.0, 10.0, 11.5], [np.nan, 20.0, 20.0]])
+        cube = pd.DataFrame(
+            values, index=pd.to_datetime(["2021-01-01", "2021-01-02"]), columns=["east", "west", "all"], copy=False
+        )
+        store = SeriesStore.from_cube(cube)
+
+        assert np.shares_memory(store.values, values), "The cube's matrix should not be copied"
+        assert store.series("all")[1].tolist() == [11.5, 20.0], "The cube's own \"all\" should be served"
+        assert store.frame("east")["Sales"].tolist() == [1.0]
+        print("✅ Wrap test passed: cubes with \"all\" are served without a copy")
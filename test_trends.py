@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from trends import RollingMeans, linear_trend, rolling_means
+
+
+def make_cube(days=400):
+    """A daily cube with a region that has gaps."""
+    dates = pd.date_range("2020-01-01", periods=days, freq="D", name="Date")
+    rng = np.random.default_rng(3)
+    cube = pd.DataFrame({"north": rng.normal(100, 10, days), "south": rng.normal(50, 5, days)}, index=dates)
+    cube.loc[cube.index[::11], "south"] = np.nan
+    cube["all"] = cube.sum(axis=1)
+    return cube
+
+
+class TestTrends:
+    """Test suite for rolling means and trend lines."""
+
+    def test_appended_days_extend_rolling_means(self):
+        """Extending with appended days should match recomputing the whole history."""
+        cube = make_cube()
+        means = RollingMeans(cube.iloc[:300])
+
+        extended = means.update(cube)
+        full = rolling_means(cube)
+        for window in (7, 30, 90):
+            pd.testing.assert_frame_equal(extended.means[window], full[window], check_freq=False)
+
+        assert extended.update(cube) is extended, "Unchanged data should reuse the means"
+        print("✅ Incremental test passed: appended days extend the rolling means")
+
+    def test_changed_history_rebuilds(self):
+        """A change to already-seen days must not reuse the old means."""
+        cube = make_cube()
+        means = RollingMeans(cube.iloc[:300])
+
+        revised = cube.copy()
+        revised.iloc[10, 0] += 1000.0
+        rebuilt = means.update(revised)
+        pd.testing.assert_frame_equal(rebuilt.means[7], rolling_means(revised)[7])
+        print("✅ Rebuild test passed: revised history is recomputed")
+
+    def test_linear_trend_fits_line(self):
+        """The trend of an exact line should be that line's endpoints."""
+        dates = pd.date_range("2021-01-01", periods=50, freq="D")
+        data = pd.DataFrame({"Date": dates, "Sales": 10.0 + 2.0 * np.arange(50)})
+
+        trend = linear_trend(data)
+        assert trend["Date"].tolist() == [dates[0], dates[-1]]
+        assert trend["Sales"].tolist() == pytest.approx([10.0, 108.0])
+        assert len(linear_trend(data.iloc[:1])) == 0
+        print("✅ Trend test passed: least-squares line through the series")
@@ -1,18 +1,36 @@
+import os
 import pandas as pd
 from datetime import datetime
 
+from impact import EventWindows, before_after_impact
+from sales_store import SQLITE_FILE, SqliteSalesStore
+
 # Test the data processing for the visualization
 print("Testing visualization data processing...")
 
-# Load the processed data
-df = pd.read_csv('formatted_data.csv')
-print(f"Loaded {len(df)} records")
+if os.path.exists(SQLITE_FILE):
+    # Query the daily totals from the indexed store (process_data.py --sqlite)
+    store = SqliteSalesStore(SQLITE_FILE)
+    print(f"Querying {SQLITE_FILE}")
+
+    # Daily totals as a Date x Region table, plus an "all" column
+    cube = store.daily_cube()
+    regions = store.regions()
+else:
+    # Load the processed data
+    df = pd.read_csv('formatted_data.csv')
+    print(f"Loaded {len(df)} records")
+
+    # Convert Date column to datetime
+    df['Date'] = pd.to_datetime(df['Date'])
 
-# Convert Date column to datetime
-df['Date'] = pd.to_datetime(df['Date'])
+    # Daily totals as a Date x Region table in one grouped pass, plus an "all" column
+    cube = df.groupby(['Date', 'Region'])['Sales'].sum().unstack('Region')
+    cube['all'] = df.groupby('Date')['Sales'].sum()
+
+    # Test region filtering functionality
+    regions = df['Region'].unique()
 
-# Test region filtering functionality
-regions = df['Region'].unique()
 print(f"Available regions: {list(regions)}")
 
 print("\n" + "="*50)
@@ -21,33 +39,42 @@ print("="*50)
 
 price_increase_date = datetime(2021, 1, 15)
 
-for region in ['all'] + list(regions):
+# Change dates compared over a window either side, e.g. other price experiments
+event_dates = [price_increase_date]
+window_days = 30
+
+# Before/after statistics for every region at once
+impact = before_after_impact(cube, price_increase_date)
+
+for region, row in impact.iterrows():
     if region == 'all':
-        region_data = df.groupby('Date')['Sales'].sum().reset_index()
         region_name = "All Regions"
     else:
-        filtered_df = df[df['Region'] == region]
-        region_data = filtered_df.groupby('Date')['Sales'].sum().reset_index()
         region_name = f"{region.title()} Region"
-    
-    region_data = region_data.sort_values('Date')
-    
-    # Calculate before/after price increase
-    before_increase = region_data[region_data['Date'] < price_increase_date]['Sales'].mean()
-    after_increase = region_data[region_data['Date'] >= price_increase_date]['Sales'].mean()
-    
+
     print(f"\n{region_name}:")
-    print(f"  Records: {len(region_data)} daily totals")
-    print(f"  Before price increase: ${before_increase:.2f}")
-    print(f"  After price increase: ${after_increase:.2f}")
-    print(f"  Change: {((after_increase - before_increase) / before_increase * 100):+.1f}%")
+    print(f"  Records: {row['n_before'] + row['n_after']:.0f} daily totals")
+    print(f"  Before price increase: ${row['before_mean']:.2f}")
+    print(f"  After price increase: ${row['after_mean']:.2f}")
+    print(f"  Change: {row['pct_change']:+.1f}% (95% CI ${row['ci_low']:+.2f} to ${row['ci_high']:+.2f} per day)")
+
+print("\n" + "="*50)
+print(f"EVENT WINDOWS ({window_days} days either side)")
+print("="*50)
+
+# Prefix sums are built once; each event window is then a constant-time lookup
+event_impacts = EventWindows(cube).impacts(event_dates, window_days)
+
+for (event, region), row in event_impacts.iterrows():
+    print(f"{event:%Y-%m-%d} {region:>5}: ${row['before_mean']:.2f} -> ${row['after_mean']:.2f}"
+          f" ({row['pct_change']:+.1f}%)")
 
 print("\n" + "="*50)
 print("OVERALL SUMMARY")
 print("="*50)
 
 # Group by date and sum sales across all regions for daily totals
-daily_sales = df.groupby('Date')['Sales'].sum().reset_index()
+daily_sales = cube['all'].rename('Sales').reset_index()
 daily_sales = daily_sales.sort_values('Date')
 
 print(f"Total processed into {len(daily_sales)} daily totals")
@@ -61,4 +88,4 @@ print(f"Overall average daily sales after Jan 15, 2021: ${after_increase:.2f}")
 print(f"Overall percentage increase: {((after_increase - before_increase) / before_increase * 100):.1f}%")
 
 print("\nSample data structure:")
-print(df.head())
\ No newline at end of file
+print(daily_sales.head())
\ No newline at end of file
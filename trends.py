@@ -0,0 +1,73 @@
+"""
+Rolling means and trend lines for the daily sales totals.
+Rolling means are computed for every region of a daily Date x Region cube at once,
+and extended incrementally when the ETL appends new days to the cube.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rolling mean windows offered on the chart, in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+def rolling_means(cube, windows=ROLLING_WINDOWS):
+    """Trailing calendar-day means of every region, as ``{window: cube}``."""
+    return {window: cube.rolling(f"{window}D").mean() for window in windows}
+
+
+class RollingMeans:
+    """Rolling means of a daily cube that can be extended as days are appended."""
+
+    def __init__(self, cube, windows=ROLLING_WINDOWS, means=None):
+        self.cube = cube
+        self.windows = tuple(windows)
+        self.means = means if means is not None else rolling_means(cube, self.windows)
+
+    def _is_prefix_of(self, cube):
+        # True when ``cube`` holds exactly this cube's days and values, plus later days
+        n = len(self.cube)
+        return (
+            0 < n <= len(cube)
+            and list(cube.columns) == list(self.cube.columns)
+            and cube.index[:n].equals(self.cube.index)
+            and np.array_equal(cube.to_numpy()[:n], self.cube.to_numpy(), equal_nan=True)
+        )
+
+    def update(self, cube):
+        """Rolling means for ``cube``, reusing this object's work where possible.
+
+        If ``cube`` only appends days to the cube these means were built from, only
+        the new days are computed, from the trailing window of history before them.
+        Any other change rebuilds the means from scratch.
+        """
+        if not self._is_prefix_of(cube):
+            return RollingMeans(cube, self.windows)
+
+        n = len(self.cube)
+        if n == len(cube):
+            return self
+
+        # The longest window of history the new days' means can reach back to
+        first_new = cube.index[n]
+        tail = cube[cube.index > first_new - pd.Timedelta(days=max(self.windows))]
+        fresh = len(cube) - n
+
+        means = {
+            window: pd.concat([self.means[window], tail.rolling(f"{window}D").mean().iloc[-fresh:]])
+            for window in self.windows
+        }
+        return RollingMeans(cube, self.windows, means)
+
+
+def linear_trend(data):
+    """Least-squares straight line through a Date/Sales series, as a two-point Date/Sales frame."""
+    if len(data) < 2:
+        return data.iloc[:0]
+
+    dates = data["Date"].to_numpy(dtype="datetime64[ns]")
+    days = (dates - dates[0]) / np.timedelta64(1, "D")
+    slope, intercept = np.polyfit(days, data["Sales"].to_numpy(dtype="float64"), 1)
+
+    ends = np.array([0, len(days) - 1])
+    return pd.DataFrame({"Date": dates[ends], "Sales": intercept + slope * days[ends]})